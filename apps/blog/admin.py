@@ -1,10 +1,64 @@
 from django.contrib import admin
 
 # Register your models here.
+from common.util.paginator import EstimatedCountPaginator
 from .models import Post, Choices, Comment, Book, Author
 
-admin.site.register(Post)
-admin.site.register(Choices)
-admin.site.register(Comment)
-admin.site.register(Book)
-admin.site.register(Author)
\ No newline at end of file
+
+class ListAdmin(admin.ModelAdmin):
+    """
+    列表页查询优化
+        - list_defer 列表页不加载的大字段，编辑页不受影响
+        - 不计算未过滤的总数（show_full_result_count），大表使用估算的总数分页
+    """
+    list_defer = ()
+    show_full_result_count = False
+    paginator = EstimatedCountPaginator
+    list_per_page = 50
+
+    def get_changelist(self, request, **kwargs):
+        changelist = super().get_changelist(request, **kwargs)
+        if not self.list_defer:
+            return changelist
+        list_defer = self.list_defer
+
+        class DeferChangeList(changelist):
+            def get_queryset(self, request, exclude_parameters=None):
+                return super().get_queryset(request, exclude_parameters).defer(*list_defer)
+
+        return DeferChangeList
+
+
+@admin.register(Post)
+class PostAdmin(ListAdmin):
+    list_display = ('id', 'title', 'author', 'status', 'published_date')
+    list_select_related = ('author',)
+    list_defer = ('content',)
+    list_filter = ('status',)
+    search_fields = ('title',)
+
+
+@admin.register(Choices)
+class ChoicesAdmin(ListAdmin):
+    list_display = ('id', 'priority', 'language', 'gender', 'category_type', 'level', 'region')
+
+
+@admin.register(Comment)
+class CommentAdmin(ListAdmin):
+    list_display = ('id', 'post_id', 'user', 'status', 'rate', 'created_date')
+    list_defer = ('content', 'json')
+    list_filter = ('status',)
+
+
+@admin.register(Book)
+class BookAdmin(ListAdmin):
+    list_display = ('id', 'title', 'price', 'author')
+    list_select_related = ('author',)
+    search_fields = ('title',)
+
+
+@admin.register(Author)
+class AuthorAdmin(ListAdmin):
+    list_display = ('id', 'name', 'age', 'user', 'studio')
+    list_select_related = ('user', 'studio')
+    search_fields = ('name',)
@@ -0,0 +1,47 @@
+# Generated by Django 5.1.15 on 2026-10-18 15:20
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0026_alter_comment_json'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        # 先创建组合索引，再删除被代替的外键索引
+        migrations.AddIndex(
+            model_name='club',
+            index=models.Index(fields=['reader', 'book'], name='blog_club_reader_book_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='club',
+            index=models.Index(fields=['borrow_date', 'reader'], name='blog_club_borrow_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['-published_date'], name='blog_post_published_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='tags',
+            index=models.Index(fields=['post', 'tag_name'], name='blog_tags_post_tag_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='tags',
+            index=models.Index(fields=['tag_name', 'post'], name='blog_tags_tag_post_idx'),
+        ),
+        migrations.AlterField(
+            model_name='club',
+            name='reader',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, to='blog.reader'),
+        ),
+        migrations.AlterField(
+            model_name='tags',
+            name='post',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, to='blog.post'),
+        ),
+    ]
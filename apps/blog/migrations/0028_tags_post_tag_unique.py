@@ -0,0 +1,31 @@
+# Generated by Django 5.1.15 on 2026-10-18 15:26
+
+from django.db import migrations, models
+from django.db.models import Count, Min
+
+
+def delete_duplicate_tags(apps, schema_editor):
+    # 添加唯一约束前删除重复的标签，保留 id 最小的一条
+    Tags = apps.get_model('blog', 'Tags')
+    duplicates = Tags.objects.values('post', 'tag_name').annotate(keep=Min('id'), count=Count('id')).filter(count__gt=1)
+    for row in duplicates:
+        Tags.objects.filter(post=row['post'], tag_name=row['tag_name']).exclude(pk=row['keep']).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0027_blog_lookup_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(delete_duplicate_tags, migrations.RunPython.noop),
+        migrations.RemoveIndex(
+            model_name='tags',
+            name='blog_tags_post_tag_idx',
+        ),
+        migrations.AddConstraint(
+            model_name='tags',
+            constraint=models.UniqueConstraint(fields=('post', 'tag_name'), name='blog_tags_post_tag_uniq'),
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.1.15 on 2026-10-18 15:30
+
+from django.db import migrations, models
+
+
+def fill_paths(apps, schema_editor):
+    # 按 parent 计算已有节点的 path
+    Tree = apps.get_model('blog', 'Tree')
+    parents = dict(Tree.objects.values_list('id', 'parent_id'))
+    paths = {}
+
+    def path_of(pk):
+        if pk not in paths:
+            parent = parents[pk]
+            paths[pk] = f"{path_of(parent)}{parent}/" if parent is not None else '/'
+        return paths[pk]
+
+    Tree.objects.bulk_update([Tree(id=pk, path=path_of(pk)) for pk in parents], ['path'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0028_tags_post_tag_unique'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tree',
+            name='path',
+            field=models.CharField(db_index=True, default='/', editable=False, max_length=255),
+        ),
+        migrations.RunPython(fill_paths, migrations.RunPython.noop),
+    ]
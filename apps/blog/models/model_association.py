@@ -4,6 +4,7 @@ from django.utils import timezone
 from faker import Faker
 
 from common.util import utils
+from common.util.batch_prefetch import BatchQuerySet, batch_prefetch
 
 faker = Faker()
 
@@ -12,7 +13,7 @@ class Studio(models.Model):
     name = models.CharField(max_length=50, blank=False, null=False)
     address = models.CharField(max_length=50, blank=False, null=False)
 
-    __str__ = lambda self: utils.object_to_string(self)
+    __str__ = utils.model_to_string
 
 
 """
@@ -26,7 +27,7 @@ class Author(models.Model):
     user = models.OneToOneField(User, on_delete=models.CASCADE, verbose_name="用户基本信息", related_name="author_of", null=True)
     studio = models.OneToOneField(Studio, on_delete=models.CASCADE, verbose_name="工作室", null=True)
 
-    __str__ = lambda self: utils.object_to_string(self)
+    __str__ = utils.model_to_string
 
     @staticmethod
     def mock_data():
@@ -68,7 +69,7 @@ class Book(models.Model):
     # 自定义管理器
     entries = EntryManager()
     objects = models.Manager()  # Default Manager
-    __str__ = lambda self: utils.object_to_string(self)
+    __str__ = utils.model_to_string
 
     @staticmethod
     def mock_data():
@@ -93,7 +94,9 @@ class Publisher(models.Model):
     """
     books = models.ManyToManyField(Book)
 
-    # __str__ = lambda self: utils.object_to_string(self)
+    # __str__ 访问 books，同一次查询的出版社一次查询预加载 books
+    objects = BatchQuerySet.as_manager()
+    # __str__ = utils.model_to_string
 
     @staticmethod
     def mock_data():
@@ -102,7 +105,7 @@ class Publisher(models.Model):
     def __str__(self):
         return "%s (%s)" % (
             self.publisher_name,
-            ", ".join(book.title for book in self.books.all()),
+            ", ".join(book.title for book in batch_prefetch(self, 'books').books.all()),
         )
 
 
@@ -118,7 +121,7 @@ class Reader(models.Model):
     reader_name = models.CharField(max_length=50, blank=False, null=False)
     books = models.ManyToManyField('Book', through='Club', through_fields=('reader', 'book'))
 
-    __str__ = lambda self: utils.object_to_string(self)
+    __str__ = utils.model_to_string
 
 
 class Club(models.Model):
@@ -127,12 +130,21 @@ class Club(models.Model):
         # through_fields=('reader', 'book') 显式地为多对多关系中涉及的中间模型指定外键
         # 存在两个相同 外键 Book，如果不设置会出错
     """
-    reader = models.ForeignKey(Reader, on_delete=models.CASCADE)
+    # 外键索引由 (reader, book) 组合索引代替
+    reader = models.ForeignKey(Reader, on_delete=models.CASCADE, db_index=False)
     book = models.ForeignKey(Book, on_delete=models.CASCADE)
     recommended = models.ForeignKey(Book, on_delete=models.CASCADE, verbose_name="推荐一本书", related_name="club_recommended", null=True)
 
     borrow_date = models.DateField(default=timezone.now)
-    __str__ = lambda self: utils.object_to_string(self)
+    __str__ = utils.model_to_string
+
+    class Meta:
+        indexes = [
+            # 按读者、读者和书查询借阅记录（reader.books 多对多查询）
+            models.Index(fields=['reader', 'book'], name='blog_club_reader_book_idx'),
+            # 按借阅日期查询、排序
+            models.Index(fields=['borrow_date', 'reader'], name='blog_club_borrow_date_idx'),
+        ]
 
 
 class Employee(models.Model):
@@ -158,7 +170,7 @@ class Employee(models.Model):
     """
     teams = models.ManyToManyField('self', db_table='employee_teams')
 
-    __str__ = lambda self: utils.object_to_string(self)
+    __str__ = utils.model_to_string
 
 
 class Topping(models.Model):
@@ -170,10 +182,12 @@ class Pizza(models.Model):
     name = models.CharField(max_length=50)
     toppings = models.ManyToManyField(Topping)
 
+    objects = BatchQuerySet.as_manager()
+
     def __str__(self):
         return "%s (%s)" % (
             self.name,
-            ", ".join(topping.name for topping in self.toppings.all()),
+            ", ".join(topping.name for topping in batch_prefetch(self, 'toppings').toppings.all()),
         )
 
 class Restaurant(models.Model):
@@ -84,4 +84,4 @@ class Choices(models.Model):
     medal_type = models.CharField(max_length=10, choices=MedalType.choices, verbose_name='MedalType', default=MedalType.BRONZE)
     place = models.IntegerField(choices=Place.choices, verbose_name='Place', default=Place.THIRD)
 
-    __str__ = lambda self: utils.object_to_string(self)
+    __str__ = utils.model_to_string
@@ -13,11 +13,17 @@ class Post(models.Model):
     author = models.ForeignKey('auth.User', on_delete=models.CASCADE)
     status = models.BooleanField(default=False, db_comment='Published or not')
 
+    class Meta:
+        indexes = [
+            # 首页按发布时间倒序
+            models.Index(fields=['-published_date'], name='blog_post_published_idx'),
+        ]
+
     def publish(self):
         self.published_date = timezone.now()
         self.save()
 
-    __str__ = lambda self: utils.object_to_string(self)
+    __str__ = utils.model_to_string
 
 
 class TagsManager(models.Manager):
@@ -30,13 +36,43 @@ class TagsManager(models.Manager):
 
 class Tags(models.Model):
     tag_name = models.CharField(max_length=50, blank=False, null=False)
-    post = models.ForeignKey(Post, on_delete=models.CASCADE)
+    # 外键索引由 (post, tag_name) 唯一约束的索引代替
+    post = models.ForeignKey(Post, on_delete=models.CASCADE, db_index=False)
+
+    class Meta:
+        constraints = [
+            # 同一篇文章的标签不重复，按文章查询标签，以及按文章和标签名称查询
+            models.UniqueConstraint(fields=['post', 'tag_name'], name='blog_tags_post_tag_uniq'),
+        ]
+        indexes = [
+            # 按标签名称查询文章，覆盖索引，只查询 post_id 时不需要回表
+            models.Index(fields=['tag_name', 'post'], name='blog_tags_tag_post_idx'),
+        ]
 
     # objects = TagsManager()
-    __str__ = lambda self: utils.object_to_string(self, 6)
+    __str__ = lambda self: utils.model_to_string(self, 6)
 
     @classmethod
     def create_tags(cls, tags, post):
         tag = cls(tag_name=tags, post=post)
         print(f"tag: {tag}")
         return tag
+
+    @classmethod
+    def add_tags(cls, post_id: int, tag_names) -> list:
+        """
+        批量添加文章的标签，一次查询已有的标签，一次批量插入新的标签
+            - 去掉空白和重复的标签名称，已有的标签不再插入
+            - 并发添加相同标签时，由 (post, tag_name) 唯一约束和 ignore_conflicts 忽略冲突的行
+        :param post_id: 文章 id，调用方需要先校验文章存在
+        :param tag_names: 标签名称
+        :return: 新增的标签（ignore_conflicts 时没有主键）
+        """
+        names = list(dict.fromkeys(name.strip() for name in tag_names if name and name.strip()))
+        if not names:
+            return []
+        existing = set(cls.objects.filter(post_id=post_id, tag_name__in=names).values_list('tag_name', flat=True))
+        tags = [cls(post_id=post_id, tag_name=name) for name in names if name not in existing]
+        if tags:
+            cls.objects.bulk_create(tags, ignore_conflicts=True)
+        return tags
@@ -11,7 +11,7 @@ class Person(models.Model):
     name = models.CharField(max_length=50)
     age = models.IntegerField()
 
-    __str__ = lambda self: utils.object_to_string(self)
+    __str__ = utils.model_to_string
 
 """
     多表继承：一对一，显示设置 parent_link=True
@@ -31,7 +31,7 @@ class Student(Person):
     )
 
     def __str__(self):
-        return utils.object_to_string(self)
+        return utils.model_to_string(self)
 
 """
     多表继承 - 一对一，不设置parent_link
@@ -41,7 +41,7 @@ class Teacher(Person):
     # 在大多数情况下，你不需要手动定义 parent_link，因为 Django 在检测到多表继承时会自动为你创建这个字段
 
     def __str__(self):
-        return utils.object_to_string(self)
+        return utils.model_to_string(self)
 
 """
     多表继承 - 多对多
@@ -50,7 +50,7 @@ class Project(models.Model):
     name = models.CharField(max_length=20)
     description = models.TextField()
 
-    __str__ = lambda self: utils.object_to_string(self)
+    __str__ = utils.model_to_string
 
 class WebProject(Project):
     url = models.URLField()
@@ -49,4 +49,4 @@ class Comment(models.Model):
         db_persist=True
     )
 
-    __str__ = lambda self: utils.object_to_string(self)
+    __str__ = utils.model_to_string
@@ -1,15 +1,211 @@
-from django.db import models
+from django.db import models, router, transaction
+from django.db.models import Q, Value
+from django.db.models.functions import Concat, Length, Substr
 
 from common.util import utils
 
 
+class TreeNode:
+    """
+    内存中的树节点，__slots__ 没有 __dict__，加载大量节点时比模型对象节省内存
+    """
+    __slots__ = ('id', 'node', 'parent_id', 'children')
+
+    def __init__(self, id: int, node: str, parent_id: int | None):
+        self.id = id
+        self.node = node
+        self.parent_id = parent_id
+        self.children = []
+
+    def __repr__(self):
+        return f"<TreeNode {self.id}: {self.node}>"
+
+
+class TreeQuerySet(models.QuerySet):
+    """
+    一次查询加载整个森林，在内存中按 parent_id -> 子节点 的索引组装层级，不再每个节点查询一次 children
+        - 没有过滤条件时加载所有节点，一次查询
+        - 有过滤条件时过滤的节点作为根节点，再按物化路径加载根节点的子树，两次查询
+        - 父节点不在结果中的节点作为根节点，子节点按 id 排序
+        Tree.objects.load_nodes()                           所有的树，TreeNode
+        Tree.objects.filter(node='python').load_forest()    python 的子树，Tree
+    """
+
+    def load_nodes(self) -> list[TreeNode]:
+        """
+        :return: TreeNode 根节点
+        """
+        nodes = [TreeNode(*row) for row in self._subtree_rows(('id', 'node', 'parent_id'))]
+        roots, children = _assemble(nodes)
+        for node in nodes:
+            node.children = children.get(node.id, [])
+        return roots
+
+    def load_forest(self) -> list['Tree']:
+        """
+        填充每个节点 children 的预加载缓存以及子节点 parent 的缓存，
+        模板中遍历 node.children.all、访问 node.parent 不会再查询
+        :return: Tree 根节点
+        """
+        fields = [field.attname for field in Tree._meta.concrete_fields]
+        nodes = [Tree.from_db(self.db, fields, row) for row in self._subtree_rows(fields)]
+        roots, children = _assemble(nodes)
+        parent_field = Tree._meta.get_field('parent')
+        for node in nodes:
+            node_children = children.get(node.id, [])
+            for child in node_children:
+                parent_field.set_cached_value(child, node)
+            # 与 prefetch_related('children') 相同的缓存
+            queryset = node.children.get_queryset()
+            queryset._result_cache = node_children
+            queryset._prefetch_done = True
+            node._prefetched_objects_cache = {'children': queryset}
+        return roots
+
+    def _subtree_rows(self, fields) -> list[tuple]:
+        if not self.query.where:
+            return list(self.order_by('id').values_list(*fields))
+        roots = list(self.values_list('id', 'path'))
+        if not roots:
+            return []
+        condition = Q(pk__in=[pk for pk, _ in roots])
+        for pk, path in roots:
+            condition |= Tree.subtree_filter(f"{path}{pk}/")
+        return list(Tree.objects.filter(condition).order_by('id').values_list(*fields))
+
+
+def _assemble(nodes: list) -> tuple[list, dict]:
+    """
+    :return: 根节点，parent_id -> 子节点 的索引
+    """
+    ids = {node.id for node in nodes}
+    roots, children = [], {}
+    for node in nodes:
+        if node.parent_id in ids:
+            children.setdefault(node.parent_id, []).append(node)
+        else:
+            roots.append(node)
+    return roots, children
+
+
 class Tree(models.Model):
     """
     递归关系
     https://docs.djangoproject.com/zh-hans/5.1/ref/models/fields/#recursive-relationships
+
+    物化路径（materialized path）：path 保存所有祖先节点的 id，例如 /1/3/ 表示父节点为 3，祖父节点为 1
+        - descendants()：path 以 /1/3/7/ 开头的节点，path 索引上的一次范围查询
+        - ancestors()：按 path 中的 id 一次查询
+        - save() 时从数据库读取父节点的 path 维护 path，移动节点时用一条 UPDATE 修改子孙节点的 path；删除时子孙节点级联删除，不需要维护
+        - QuerySet.update()、bulk_create() 不调用 save()，批量修改 parent 之后需要调用 Tree.rebuild_paths()
     """
     node = models.CharField(max_length=50, blank=False, null=False)
     # 自引用
     parent = models.ForeignKey('self', on_delete=models.CASCADE, null=True, related_name='children')
+    # 祖先节点 id 的路径，根节点为 /
+    path = models.CharField(max_length=255, default='/', editable=False, db_index=True)
+
+    objects = TreeQuerySet.as_manager()
+
+    __str__ = utils.model_to_string
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'parent' not in update_fields:
+            return super().save(*args, **kwargs)
+        if update_fields is not None:
+            kwargs['update_fields'] = {*update_fields, 'path'}
+
+        using = kwargs.get('using') or router.db_for_write(Tree, instance=self)
+        adding = self._state.adding
+        with transaction.atomic(using=using):
+            # 父节点和自己的 path 从数据库读取，内存中的对象可能在加载之后被移动过
+            ids = [pk for pk in (self.parent_id, None if adding else self.pk) if pk is not None]
+            paths = dict(Tree.objects.using(using).select_for_update().filter(pk__in=ids).values_list('id', 'path')) \
+                if ids else {}
+            if self.parent_id is not None and self.parent_id not in paths:
+                raise Tree.DoesNotExist(f"parent {self.parent_id} does not exist")
+            path = f"{paths[self.parent_id]}{self.parent_id}/" if self.parent_id is not None else '/'
+            old_path = paths.get(self.pk) if not adding else None
+            # 不能移动到自己或自己的子孙节点下
+            if old_path is not None and f"/{self.pk}/" in path:
+                raise ValueError(f"cannot move {self} under its own descendant")
+
+            self.path = path
+            super().save(*args, **kwargs)
+            if old_path is not None and old_path != path:
+                # 移动节点：子孙节点的 path 前缀替换为新的路径
+                old_prefix, new_prefix = f"{old_path}{self.pk}/", f"{path}{self.pk}/"
+                Tree.objects.using(using).filter(Tree.subtree_filter(old_prefix)).update(
+                    path=Concat(Value(new_prefix), Substr('path', len(old_prefix) + 1)))
+
+    @property
+    def depth(self) -> int:
+        """
+        节点的层级，根节点为 0
+        """
+        return self.path.count('/') - 1
+
+    @property
+    def ancestor_ids(self) -> list[int]:
+        return [int(pk) for pk in self.path.strip('/').split('/') if pk]
+
+    @staticmethod
+    def subtree_filter(prefix: str) -> Q:
+        """
+        path 以 prefix 开头的条件：prefix <= path < prefix 的最后一个 '/' 换成 '0'（'/' 的下一个字符）
+        使用范围比较而不是 LIKE 'prefix%'，在所有数据库上都可以使用 path 索引
+        """
+        return Q(path__gte=prefix, path__lt=f"{prefix[:-1]}0")
+
+    def descendants(self, include_self: bool = False) -> models.QuerySet:
+        """
+        所有子孙节点，一次查询
+        :param include_self: 是否包括自己
+        """
+        condition = self.subtree_filter(f"{self.path}{self.pk}/")
+        if include_self:
+            condition |= Q(pk=self.pk)
+        return Tree.objects.filter(condition)
+
+    def ancestors(self, include_self: bool = False) -> models.QuerySet:
+        """
+        所有祖先节点，从根节点开始，一次查询（根节点不查询）
+        :param include_self: 是否包括自己
+        """
+        ids = self.ancestor_ids + ([self.pk] if include_self else [])
+        if not ids:
+            return Tree.objects.none()
+        return Tree.objects.filter(pk__in=ids).order_by(Length('path'))
+
+    def subtree_as_nested_dict(self) -> dict:
+        """
+        以当前节点为根的子树，一次查询
+        :return: {'id': 1, 'node': 'root', 'children': [{'id': 2, 'node': 'java', 'children': [...]}, ...]}
+        """
+        rows = list(self.descendants(include_self=True).order_by('id').values('id', 'node', 'parent_id'))
+        nodes = {row['id']: {'id': row['id'], 'node': row['node'], 'children': []} for row in rows}
+        for row in rows:
+            if row['id'] != self.pk and row['parent_id'] in nodes:
+                nodes[row['parent_id']]['children'].append(nodes[row['id']])
+        return nodes[self.pk]
+
+    @classmethod
+    def rebuild_paths(cls) -> int:
+        """
+        按 parent 重新计算所有节点的 path
+        :return: 修改的节点数量
+        """
+        rows = cls.objects.values_list('id', 'parent_id', 'path')
+        parents = {pk: parent_id for pk, parent_id, _ in rows}
+        paths = {}
+
+        def path_of(pk):
+            if pk not in paths:
+                parent = parents[pk]
+                paths[pk] = f"{path_of(parent)}{parent}/" if parent is not None else '/'
+            return paths[pk]
 
-    __str__ = lambda self: utils.object_to_string(self)
+        changed = [cls(id=pk, path=path_of(pk)) for pk, _, path in rows if path_of(pk) != path]
+        cls.objects.bulk_update(changed, ['path'], batch_size=500)
+        return len(changed)
@@ -0,0 +1,74 @@
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+
+from apps.blog.models import Post, Comment, Book, Author
+from apps.blog.tests.tests import BasedTestCase
+from common.util.paginator import EstimatedCountPaginator, estimate_count
+
+
+# 不显示调试工具栏
+@override_settings(INTERNAL_IPS=[])
+class AdminChangeListTest(BasedTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.user = User.objects.create_superuser(username="admin", password="admin", email="admin@example.com")
+        self.client.force_login(self.user)
+        posts = Post.objects.bulk_create([Post(title=f"post {i}", content="content " * 100, author=self.user)
+                                          for i in range(20)])
+        Comment.objects.bulk_create([Comment(post=post, content="comment", email="tom@example.com", json={'a': 1})
+                                     for post in posts])
+        author = Author.objects.create(name="tom", user=self.user)
+        Book.objects.bulk_create([Book(title=f"book {i}", price=i, author=author) for i in range(20)])
+
+    def changelist(self, model: str) -> list:
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(f"/admin/blog/{model}/")
+        self.assertEqual(response.status_code, 200)
+        return [query['sql'] for query in context.captured_queries]
+
+    def test_post_changelist(self):
+        queries = self.changelist('post')
+        selects = [sql for sql in queries if sql.startswith('SELECT "blog_post"."id"')]
+        self.assertEqual(len(selects), 1)
+        self.assertIn('INNER JOIN "auth_user"', selects[0])
+        self.assertNotIn('"blog_post"."content"', selects[0])
+
+    def test_comment_changelist(self):
+        queries = self.changelist('comment')
+        selects = [sql for sql in queries if '"blog_comment"."id"' in sql and 'COUNT' not in sql]
+        self.assertEqual(len(selects), 1)
+        self.assertNotIn('"blog_comment"."content"', selects[0])
+        self.assertNotIn('"blog_comment"."json"', selects[0])
+        # 只执行一次过滤后的 COUNT
+        self.assertEqual(len([sql for sql in queries if 'COUNT(*)' in sql and 'blog_comment' in sql]), 1)
+
+    def test_book_changelist(self):
+        queries = self.changelist('book')
+        self.assertEqual(len([sql for sql in queries if 'FROM "blog_author"' in sql]), 0)
+
+    def test_change_form(self):
+        post = Post.objects.first()
+        response = self.client.get(f"/admin/blog/post/{post.id}/change/")
+        self.assertContains(response, post.content.strip())
+
+
+class EstimatedCountPaginatorTest(BasedTestCase):
+
+    def setUp(self):
+        super().setUp()
+        Book.objects.bulk_create([Book(title=f"book {i}", price=i) for i in range(30)])
+
+    def test_estimate_count(self):
+        self.assertEqual(estimate_count(Book), 30)
+
+    def test_paginator(self):
+        paginator = type('Paginator', (EstimatedCountPaginator,), {'threshold': 10})
+        Book.objects.filter(price__lt=10).delete()
+        with self.assertNumQueries(1):
+            # 估算值包括删除的数据
+            self.assertEqual(paginator(Book.objects.all(), 10).count, 30)
+        self.assertEqual(paginator(Book.objects.filter(price__gte=15), 10).count, 15)
+        self.assertEqual(EstimatedCountPaginator(Book.objects.all(), 10).count, 20)
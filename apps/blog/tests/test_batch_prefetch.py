@@ -0,0 +1,49 @@
+import pickle
+
+from apps.blog.models import Book, Publisher, Topping, Pizza
+from apps.blog.tests.tests import BasedTestCase
+
+
+class BatchPrefetchTest(BasedTestCase):
+
+    def setUp(self):
+        super().setUp()
+        books = Book.objects.bulk_create([Book(title=f"book {i}", price=i) for i in range(3)])
+        publishers = Publisher.objects.bulk_create([Publisher(publisher_name=f"publisher {i}") for i in range(100)])
+        for publisher in publishers:
+            publisher.books.add(*books)
+
+    def test_publisher_str(self):
+        with self.assertNumQueries(2):
+            names = [str(publisher) for publisher in Publisher.objects.all()]
+        self.assertEqual(len(names), 100)
+        self.assertEqual(names[0], "publisher 0 (book 0, book 1, book 2)")
+
+    def test_publisher_repr(self):
+        with self.assertNumQueries(2):
+            repr(Publisher.objects.all())
+
+    def test_prefetched(self):
+        with self.assertNumQueries(2):
+            [str(publisher) for publisher in Publisher.objects.prefetch_related('books')]
+
+    def test_single(self):
+        publisher = Publisher.objects.first()
+        with self.assertNumQueries(1):
+            str(publisher)
+        publisher.books.remove(publisher.books.first())
+        self.assertEqual(str(publisher), "publisher 0 (book 1, book 2)")
+
+    def test_pickle(self):
+        publishers = list(Publisher.objects.all())
+        publisher = pickle.loads(pickle.dumps(publishers[0]))
+        self.assertEqual(len(publisher._state.batch), 0)
+        self.assertEqual(str(publisher), "publisher 0 (book 0, book 1, book 2)")
+
+    def test_pizza_str(self):
+        toppings = Topping.objects.bulk_create([Topping(name=f"topping {i}") for i in range(2)])
+        for pizza in Pizza.objects.bulk_create([Pizza(name=f"pizza {i}") for i in range(100)]):
+            pizza.toppings.add(*toppings)
+        with self.assertNumQueries(2):
+            names = [str(pizza) for pizza in Pizza.objects.all()]
+        self.assertEqual(names[-1], "pizza 99 (topping 0, topping 1)")
@@ -0,0 +1,495 @@
+import array
+import datetime
+import math
+from dataclasses import dataclass, field
+from decimal import Decimal
+from enum import Enum
+from typing import NamedTuple
+from unittest import skipIf
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import SimpleTestCase
+from django.test.utils import CaptureQueriesContext
+
+from apps.blog.models import Book, Author, Post, Employee
+from apps.blog.tests.tests import BasedTestCase
+from common.util.bean_utils import BeanUtils
+
+
+class Item:
+    def __init__(self, name=None, value=None):
+        self.name = name
+        self.value = value
+
+
+class Record:
+    def __init__(self):
+        self.name = None
+        self.value = None
+        self.title = None
+
+
+class Color(Enum):
+    RED = 1
+
+
+@dataclass(frozen=True, slots=True)
+class FrozenRecord:
+    name: str
+    value: int = 0
+    tags: list = field(default_factory=list)
+
+
+class TupleRecord(NamedTuple):
+    name: str
+    value: int = 0
+
+
+class SlotsRecord:
+    __slots__ = ('name', 'value')
+
+    def __init__(self, name=None, value=None):
+        self.name = name
+        self.value = value
+
+
+class SlotsNoArgsRecord:
+    __slots__ = ('name', 'value')
+
+
+@dataclass
+class AuthorDTO:
+    name: str = None
+    age: int = None
+
+
+@dataclass(frozen=True)
+class BookDTO:
+    title: str
+    author: AuthorDTO | None = None
+
+
+@dataclass(eq=False)
+class EmployeeDTO:
+    name: str = None
+    teams: list['EmployeeDTO'] = field(default_factory=list)
+
+
+class Node:
+    def __init__(self, name=None, parent=None):
+        self.name = name
+        self.parent = parent
+        self.children = []
+
+
+class NodeRecord:
+    name: str
+    parent: 'NodeRecord'
+    children: list['NodeRecord']
+
+    def __init__(self):
+        self.name = None
+        self.parent = None
+        self.children = []
+
+
+try:
+    import attr
+except ImportError:
+    attr = None
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+class BeanUtilsTest(SimpleTestCase):
+    """
+    BeanUtils 对象属性复制
+    """
+    def setUp(self):
+        super().setUp()
+        BeanUtils.clear_plans()
+
+    def test_copy_plan_cached(self):
+        plan = BeanUtils.get_plan(Item, Record)
+        self.assertIs(plan, BeanUtils.get_plan(Item, Record))
+        self.assertIsNot(plan, BeanUtils.get_plan(Item, Record, skip_null=True))
+        self.assertIsNot(plan, BeanUtils.get_plan(Item, Record, {'name': 'title'}))
+
+    def test_copy_properties(self):
+        records = [BeanUtils.copy_properties(Item(f"item {i}", i), Record) for i in range(3)]
+        self.assertEqual([(r.name, r.value) for r in records], [("item 0", 0), ("item 1", 1), ("item 2", 2)])
+
+        record = BeanUtils.copy_properties(Item("apple", 1), Record, {'name': 'title'})
+        self.assertEqual((record.name, record.title, record.value), (None, "apple", 1))
+
+    def test_copy_properties_skip_null(self):
+        record = Record()
+        record.value = 2
+        BeanUtils.copy_properties(Item("apple"), record, skip_null=True)
+        self.assertEqual((record.name, record.value), ("apple", 2))
+
+        BeanUtils.copy_properties(Item("apple"), record)
+        self.assertIsNone(record.value)
+
+    def test_copy_properties_skip_custom_object(self):
+        record = BeanUtils.copy_properties(Item(Item(), Color.RED), Record)
+        self.assertIsNone(record.name)
+        self.assertIs(record.value, Color.RED)
+
+    def test_copy_properties_dict_layout(self):
+        # 不同的 dict 属性布局共享同一个复制计划
+        self.assertEqual(vars(BeanUtils.copy_properties({'name': 'a', 'value': 1}, Record)),
+                         {'name': 'a', 'value': 1, 'title': None})
+        self.assertEqual(vars(BeanUtils.copy_properties({'title': 'b', 'other': 2}, Record)),
+                         {'name': None, 'value': None, 'title': 'b'})
+        self.assertEqual(vars(BeanUtils.copy_properties({'value': 3}, Record)),
+                         {'name': None, 'value': 3, 'title': None})
+
+    def test_copy_properties_instance_layout(self):
+        class OptionalRecord:
+            def __init__(self, extra=False):
+                self.name = None
+                if extra:
+                    self.value = None
+
+        # 已有的 target 对象按各自的属性检查，与复制的顺序无关
+        for extras in ((False, True), (True, False)):
+            BeanUtils.clear_plans()
+            records = [BeanUtils.copy_properties(Item("apple", 1), OptionalRecord(extra)) for extra in extras]
+            self.assertEqual([vars(record) for record in records],
+                             [{'name': 'apple', 'value': 1} if extra else {'name': 'apple'} for extra in extras])
+
+    def test_copy_properties_setter(self):
+        class Target:
+            def __init__(self):
+                self._name = None
+
+            @property
+            def name(self):
+                return self._name
+
+            @name.setter
+            def name(self, value):
+                self._name = value.upper()
+
+        self.assertEqual(BeanUtils.copy_properties(Item("apple", 1), Target).name, "APPLE")
+
+    def test_copy_properties_model(self):
+        book = Book(id=1, title="django", author_id=2)
+        record = BeanUtils.copy_properties(book, Record)
+        self.assertEqual((record.title, record.name), ("django", None))
+
+    def test_copy_list(self):
+        sources = [Item("apple", 1), {'name': 'banana', 'value': 2, 'other': 0}, Item("pear", 3)]
+        records = BeanUtils.copy_list(sources, Record)
+        self.assertEqual([(r.name, r.value) for r in records], [("apple", 1), ("banana", 2), ("pear", 3)])
+        self.assertEqual(len({id(r) for r in records}), 3)
+        self.assertEqual([vars(r) for r in BeanUtils.copy(sources, Record)], [vars(r) for r in records])
+
+        records = BeanUtils.copy_list([Item("apple", 1)], Record, {'name': 'title'})
+        self.assertEqual((records[0].title, records[0].name), ("apple", None))
+
+        with self.assertRaises(ValueError):
+            BeanUtils.copy_list([Item(), None], Record)
+
+    def test_copy_rows(self):
+        rows = [("apple", 1, "x"), ("banana", None, "y")]
+        records = BeanUtils.copy_rows(rows, ('name', 'value', 'other'), Record, skip_null=True)
+        self.assertEqual([vars(r) for r in records], [
+            {'name': 'apple', 'value': 1, 'title': None},
+            {'name': 'banana', 'value': None, 'title': None},
+        ])
+
+        records = BeanUtils.copy_rows([("apple",)], ['name'], Record, {'name': 'title'})
+        self.assertEqual(records[0].title, "apple")
+
+        # values_list 的 Decimal、datetime 等值类型不是自定义对象，需要复制
+        published = datetime.datetime(2024, 1, 1, 12, 30)
+        records = BeanUtils.copy_rows([(Decimal("9.90"), published)], ('value', 'title'), Record)
+        self.assertEqual((records[0].value, records[0].title), (Decimal("9.90"), published))
+        records = BeanUtils.copy_rows([(Decimal("1.5"), None)], ('name', 'value'), FrozenRecord, skip_null=True)
+        self.assertEqual(records, [FrozenRecord(Decimal("1.5"))])
+
+    def test_copy_columns_value_types(self):
+        day = datetime.date(2024, 1, 1)
+        records = BeanUtils.copy_columns({'name': ["apple"], 'value': [Decimal("2.50")], 'title': [day]}, Record)
+        self.assertEqual((records[0].value, records[0].title), (Decimal("2.50"), day))
+
+    def test_copy_columns(self):
+        records = BeanUtils.copy_columns({'name': ["apple", "banana"], 'value': [1, 2]}, Record)
+        self.assertEqual([(r.name, r.value) for r in records], [("apple", 1), ("banana", 2)])
+
+        with self.assertRaises(ValueError):
+            BeanUtils.copy_columns({'name': ["apple", "banana"], 'value': [1]}, Record)
+
+    def test_diagnostics(self):
+        with BeanUtils.collect_diagnostics(report=False) as diagnostics:
+            BeanUtils.copy_list([{'name': 'apple', 'other': 1}] * 100, Record)
+            BeanUtils.copy_properties({'other': 2}, Record)
+            BeanUtils.copy(Record(), Record)
+        self.assertEqual(diagnostics.counts(), {
+            'missing': {'dict -> Record': {'other': 101}},
+            'errors': {},
+            'same_type': {'Record': 1},
+        })
+        self.assertIsNot(diagnostics, BeanUtils.diagnostics())
+
+    def test_diagnostics_report_once(self):
+        with self.assertLogs('common.util.bean_utils', 'WARNING') as logs:
+            with BeanUtils.collect_diagnostics():
+                for i in range(100):
+                    BeanUtils.copy_properties(Item("apple", i), Record, {'value': 'price'})
+        self.assertEqual(logs.output, [
+            "WARNING:common.util.bean_utils:Item -> Record missing properties: price x 100",
+        ])
+
+        # 默认诊断，同一属性只输出一次日志
+        with self.assertLogs('common.util.bean_utils', 'WARNING') as logs:
+            for i in range(100):
+                BeanUtils.copy_properties(Item("apple", i), Record, {'value': 'amount'})
+        self.assertEqual(len(logs.output), 1)
+
+    def test_copy_frozen_dataclass(self):
+        record = BeanUtils.copy_properties(Item("apple", 1), FrozenRecord)
+        self.assertEqual(record, FrozenRecord("apple", 1))
+
+        # frozen dataclass 不能修改，复制后返回新对象
+        copied = BeanUtils.copy_properties({'value': 2, 'other': 3}, record)
+        self.assertEqual((copied, record.value), (FrozenRecord("apple", 2), 1))
+
+        records = BeanUtils.copy_rows([("apple", 1), ("pear", 2)], ('name', 'value'), FrozenRecord)
+        self.assertEqual(records, [FrozenRecord("apple", 1), FrozenRecord("pear", 2)])
+
+        with self.assertRaises(TypeError):
+            BeanUtils.copy_properties({'value': 1}, FrozenRecord)
+
+    def test_copy_mutable_dataclass(self):
+        # 已有的可变 dataclass 对象直接复制到原对象上
+        target = AuthorDTO()
+        self.assertIs(BeanUtils.copy_properties(Item("tom", 30), target, {'value': 'age'}), target)
+        self.assertEqual(target, AuthorDTO("tom", 30))
+        self.assertIs(BeanUtils.copy_properties({'age': 31}, target), target)
+        self.assertEqual(target, AuthorDTO("tom", 31))
+
+        targets = [AuthorDTO(), AuthorDTO()]
+        BeanUtils.copy_list([{'name': 'tom'}], targets[0])
+        self.assertEqual(targets, [AuthorDTO("tom"), AuthorDTO()])
+
+        # 类型仍然通过构造函数创建
+        self.assertEqual(BeanUtils.copy_properties({'name': 'tom'}, AuthorDTO), AuthorDTO("tom"))
+
+    def test_copy_named_tuple(self):
+        records = BeanUtils.copy_list([Item("apple", 1), {'name': 'pear'}], TupleRecord)
+        self.assertEqual(records, [TupleRecord("apple", 1), TupleRecord("pear", 0)])
+        self.assertEqual(BeanUtils.copy_properties({'value': 2}, records[0]), TupleRecord("apple", 2))
+
+    def test_copy_slots(self):
+        record = BeanUtils.copy_properties(Item("apple", 1), SlotsRecord)
+        self.assertEqual((record.name, record.value), ("apple", 1))
+
+        record = BeanUtils.copy_properties(Item("apple", 1), SlotsNoArgsRecord)
+        self.assertEqual((record.name, record.value), ("apple", 1))
+
+        # 可修改的 __slots__ 对象直接复制到原对象上
+        target = SlotsNoArgsRecord()
+        self.assertIs(BeanUtils.copy_properties({'name': 'pear'}, target), target)
+        self.assertEqual(target.name, "pear")
+
+        target = SlotsRecord(value=2)
+        self.assertIs(BeanUtils.copy_properties(Item("apple"), target, skip_null=True), target)
+        self.assertEqual((target.name, target.value), ("apple", 2))
+        self.assertIs(BeanUtils.copy_properties({'value': 3}, target), target)
+        self.assertEqual((target.name, target.value), ("apple", 3))
+
+    @skipIf(attr is None, "attrs is not installed")
+    def test_copy_attrs(self):
+        @attr.s(frozen=True, slots=True)
+        class AttrsRecord:
+            name = attr.ib()
+            _value = attr.ib(default=0)
+
+        record = BeanUtils.copy_properties({'name': 'apple', '_value': 1}, AttrsRecord)
+        self.assertEqual(record, AttrsRecord("apple", 1))
+        # frozen 对象返回新对象
+        self.assertEqual(BeanUtils.copy_properties({'name': 'pear'}, record), AttrsRecord("pear", 1))
+        self.assertEqual(record.name, "apple")
+
+        @attr.s
+        class MutableAttrsRecord:
+            name = attr.ib(default=None)
+            value = attr.ib(default=0)
+
+        target = MutableAttrsRecord()
+        self.assertIs(BeanUtils.copy_properties(Item("apple", 1), target), target)
+        self.assertEqual(target, MutableAttrsRecord("apple", 1))
+
+    def test_copy_nested(self):
+        root = Node("root")
+        root.children = [Node("a", root), Node("b", root)]
+
+        # 默认不复制嵌套对象
+        self.assertIsNone(BeanUtils.copy_properties(root.children[0], NodeRecord).parent)
+
+        record = BeanUtils.copy_properties(root, NodeRecord, nested=True)
+        self.assertEqual([child.name for child in record.children], ["a", "b"])
+        self.assertIsInstance(record.children[0], NodeRecord)
+        # 循环引用指向同一个 target
+        self.assertIs(record.children[0].parent, record)
+        self.assertIs(record.children[1].parent, record)
+
+
+class BeanUtilsQuerySetTest(BasedTestCase):
+    """
+    BeanUtils 处理 QuerySet 数据
+    """
+    def setUp(self):
+        super().setUp()
+        self.author = Author.objects.create(name="tom", age=30)
+        Book.objects.bulk_create([Book(title=f"book {i}", price=i, author=self.author) for i in range(5)])
+
+    def test_kget_iter(self):
+        values = BeanUtils.kget_iter(Book.objects.order_by('id'), 'title', chunk_size=2)
+        self.assertNotIsInstance(values, list)
+        with self.assertNumQueries(1):
+            self.assertEqual(list(values), [f"book {i}" for i in range(5)])
+
+        # 字段列直接读取，不创建模型对象
+        self.assertEqual(set(BeanUtils.kget_iter(Book.objects.all(), 'author_id')), {self.author.id})
+        # 关联路径通过 values_list 读取，关联对象通过 select_related 一次查询
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(list(BeanUtils.kget_iter(Book.objects.all(), 'author.name')), ["tom"] * 5)
+        self.assertEqual(len(queries), 1)
+        self.assertIn('SELECT "blog_author"."name" FROM', queries[0]['sql'])
+        with self.assertNumQueries(1):
+            self.assertEqual(list(BeanUtils.kget_iter(Book.objects.all(), 'author')), [self.author] * 5)
+        self.assertEqual(list(BeanUtils.kget_iter([Item("apple")], 'name')), ["apple"])
+
+    def test_iget_iter(self):
+        rows = Book.objects.order_by('id').values_list('id', 'title')
+        self.assertEqual(list(BeanUtils.iget_iter(rows, 1, chunk_size=2)), [f"book {i}" for i in range(5)])
+        self.assertEqual(list(BeanUtils.iget_iter([("aa", 1), ("bb", 2)], 1)), [1, 2])
+
+    def test_copy_iter(self):
+        records = BeanUtils.copy_iter(Book.objects.order_by('id'), Record, chunk_size=2)
+        with self.assertNumQueries(1):
+            self.assertEqual([r.title for r in records], [f"book {i}" for i in range(5)])
+
+        with self.assertRaises(TypeError):
+            BeanUtils.copy_iter(Book.objects.all(), Record())
+
+    def test_project(self):
+        user = User.objects.create(username='tom')
+        Post.objects.create(title="post", content="large content " * 1000, author=user)
+
+        @dataclass(slots=True)
+        class PostDTO:
+            title: str = None
+            author_id: int = None
+            content: str = None
+
+        with CaptureQueriesContext(connection) as queries:
+            records = BeanUtils.project(Post.objects.all(), PostDTO, {'content': 'ignored'})
+        self.assertEqual(records, [PostDTO("post", user.id)])
+        self.assertEqual(len(queries), 1)
+        self.assertNotIn('"content"', queries[0]['sql'])
+
+        self.assertEqual(BeanUtils.project_columns(Book, Record), ('title',))
+        self.assertEqual([r.title for r in BeanUtils.project(Book.objects.order_by('id')[:2], Record)], ["book 0", "book 1"])
+        self.assertEqual(len(BeanUtils.project(Book, Record)), 5)
+
+    def test_project_value_types(self):
+        # Decimal、datetime 列不是自定义对象，投影时需要复制
+        @dataclass
+        class PriceDTO:
+            title: str = None
+            price: Decimal = None
+            author_id: int = None
+
+        @dataclass
+        class PublishedDTO:
+            title: str = None
+            published_date: datetime.datetime = None
+
+        records = BeanUtils.project(Book.objects.order_by('id')[:2], PriceDTO)
+        self.assertEqual(records, [PriceDTO("book 0", Decimal("0"), self.author.id),
+                                   PriceDTO("book 1", Decimal("1"), self.author.id)])
+
+        post = Post.objects.create(title="post", content="content", author=User.objects.create(username='tom'))
+        records = BeanUtils.project(Post, PublishedDTO)
+        self.assertEqual(records, [PublishedDTO("post", post.published_date)])
+        self.assertIsInstance(records[0].published_date, datetime.datetime)
+
+    def test_copy_nested_model(self):
+        books = list(Book.objects.order_by('id'))
+        with self.assertNumQueries(1):
+            records = BeanUtils.copy_list(books, BookDTO, nested=True)
+        self.assertEqual(records[0], BookDTO("book 0", AuthorDTO("tom", 30)))
+        # 同一个作者只复制一次
+        self.assertTrue(all(record.author is records[0].author for record in records))
+
+    def test_copy_nested_cycle(self):
+        e1 = Employee.objects.create(name="e1")
+        e2 = Employee.objects.create(name="e2")
+        e3 = Employee.objects.create(name="e3")
+        e1.teams.add(e2, e3)
+
+        record = BeanUtils.copy_properties(e1, EmployeeDTO, nested=True)
+        self.assertEqual([team.name for team in record.teams], ["e2", "e3"])
+        # 对称的多对多关系，e2.teams 包含 e1
+        self.assertIs(record.teams[0].teams[0], record)
+
+    def test_kget_array(self):
+        Book.objects.create(title="free book", price=None)
+        books = Book.objects.order_by('id')
+        with CaptureQueriesContext(connection) as queries:
+            prices = BeanUtils.kget_array(books, 'price')
+        self.assertIn('SELECT "blog_book"."price" FROM', queries[0]['sql'])
+        self.assertEqual(prices.typecode, 'd')
+        self.assertEqual(prices[:5].tolist(), [0.0, 1.0, 2.0, 3.0, 4.0])
+        self.assertTrue(math.isnan(prices[5]))
+
+        self.assertEqual(BeanUtils.kget_array(books, 'author_id', 'q', null=-1)[-2:].tolist(), [self.author.id, -1])
+        with self.assertRaises(ValueError):
+            BeanUtils.kget_array(books, 'author_id', 'q')
+
+        with self.assertNumQueries(1):
+            self.assertEqual(BeanUtils.kget_array(Book.objects.filter(author__isnull=False), 'author.age', 'q').tolist(), [30] * 5)
+
+        self.assertEqual(BeanUtils.kget_array([Item("a", 1), Item("b", 2)], 'value', 'i'), array.array('i', [1, 2]))
+        self.assertEqual(BeanUtils.iget_array([("a", 1), ("b", None)], 1, 'i', null=0), array.array('i', [1, 0]))
+
+    @skipIf(numpy is None, "numpy is not installed")
+    def test_kget_ndarray(self):
+        prices = BeanUtils.kget_ndarray(Book.objects.order_by('id'), 'price')
+        self.assertEqual(prices.dtype, numpy.float64)
+        self.assertEqual(prices.sum(), 10.0)
+
+        ages = BeanUtils.iget_ndarray(Author.objects.values_list('name', 'age'), 1, dtype='int32')
+        self.assertEqual(ages.tolist(), [30])
+
+    def test_kget_many(self):
+        books = Book.objects.order_by('id')
+        with CaptureQueriesContext(connection) as queries:
+            rows = BeanUtils.kget_many(books, 'title', 'author_id', 'author.name')
+        self.assertEqual(rows[0], ("book 0", self.author.id, "tom"))
+        self.assertEqual(len(queries), 1)
+        self.assertIn('SELECT "blog_book"."title", "blog_book"."author_id", "blog_author"."name" FROM', queries[0]['sql'])
+
+        # 非字段属性通过 select_related 一次查询
+        with self.assertNumQueries(1):
+            columns = BeanUtils.kget_many(books, 'title', 'author', 'author.name', columns=True)
+        self.assertEqual(columns['title'], [f"book {i}" for i in range(5)])
+        self.assertEqual(columns['author'], [self.author] * 5)
+        self.assertEqual(columns['author.name'], ["tom"] * 5)
+
+        # 不带路径的关联属性同样 select_related
+        with self.assertNumQueries(1):
+            rows = BeanUtils.kget_many(books, 'title', 'author')
+        self.assertEqual(rows[0], ("book 0", self.author))
+
+        self.assertEqual(BeanUtils.kget_many([Item("a", 1), Item("b", 2)], 'value'), [(1,), (2,)])
+        self.assertEqual(BeanUtils.kget_many([], 'name', 'value', columns=True), {'name': [], 'value': []})
@@ -40,7 +40,7 @@ class TagsModelTest(BasedTestCase):
         print("tmp: ", tmp)
 
         # 强制保存或更新
-        tags_foo = Tags(tag_name='tag test foo', post=self.post)
+        tags_foo = Tags(tag_name='tag test bar', post=self.post)
         tags_foo.save(force_insert=True)
         tags_foo.save(force_update=True)
 
@@ -212,12 +212,15 @@ class TagsModelTest(BasedTestCase):
         tag = Tags.objects.first()
         print(tag.id)
 
+        # (post, tag_name) 唯一，复制时修改标签名称
         tag.id = None
+        tag.tag_name = 'tag test 2'
         tag.save()
         print(tag.id)
         print(Tags.objects.all())
 
         tag.id = None
+        tag.tag_name = 'tag test 3'
         tag._state.adding = True
         tag.save()
         print(tag.id)
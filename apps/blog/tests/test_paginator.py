@@ -0,0 +1,88 @@
+import datetime
+
+from django.contrib.auth.models import User
+from django.core.paginator import InvalidPage
+from django.db import connection
+from django.test import override_settings
+from django.utils import timezone
+
+from apps.blog.models import Post, Book
+from apps.blog.tests.tests import BasedTestCase
+from common.util.paginator import CursorPaginator
+
+
+@override_settings(INTERNAL_IPS=[])
+class CursorPaginatorTest(BasedTestCase):
+
+    def setUp(self):
+        super().setUp()
+        user = User.objects.create(username="tom")
+        now = timezone.now()
+        Post.objects.bulk_create([Post(title=f"post {i}", content="content", author=user) for i in range(23)])
+        # 每 3 篇文章的发布时间相同，游标需要用 id 区分
+        for post in Post.objects.all():
+            Post.objects.filter(pk=post.pk).update(published_date=now - datetime.timedelta(minutes=post.pk // 3))
+        self.expected = list(Post.objects.order_by('-published_date', '-id'))
+
+    def test_pages(self):
+        paginator = CursorPaginator(Post.objects.all(), 5)
+        page, pages = paginator.page(), []
+        self.assertFalse(page.has_previous())
+        while True:
+            pages.append(page)
+            if not page.has_next():
+                break
+            page = paginator.page(page.next_cursor)
+        self.assertEqual([post for page in pages for post in page], self.expected)
+        self.assertEqual([len(page) for page in pages], [5, 5, 5, 5, 3])
+
+        # 从最后一页往回翻页
+        previous = []
+        while page.has_previous():
+            page = paginator.page(page.previous_cursor)
+            previous.append(list(page))
+        self.assertEqual(previous[::-1], [list(page) for page in pages[:-1]])
+        self.assertFalse(page.has_previous())
+
+    def test_page_queries(self):
+        paginator = CursorPaginator(Post.objects.all(), 5)
+        cursor = paginator.page().next_cursor
+        with self.assertNumQueries(1):
+            paginator.page(cursor)
+
+    def test_ascending(self):
+        paginator = CursorPaginator(Book.objects.all(), 2, ordering=('price', 'id'))
+        Book.objects.bulk_create([Book(title=f"book {i}", price=i % 2) for i in range(5)])
+        first = paginator.page()
+        second = paginator.page(first.next_cursor)
+        third = paginator.page(second.next_cursor)
+        self.assertEqual([book.title for page in (first, second, third) for book in page],
+                         ["book 0", "book 2", "book 4", "book 1", "book 3"])
+        self.assertFalse(third.has_next())
+
+    def test_invalid_cursor(self):
+        paginator = CursorPaginator(Post.objects.all(), 5)
+        for cursor in ("x", "WzAsWzFdXQ", "WzAsWyJ4IiwieCJdXQ", "WzAsW251bGwsMV1d"):
+            with self.assertRaises(InvalidPage):
+                paginator.page(cursor)
+        with self.assertRaises(ValueError):
+            CursorPaginator(Post.objects.all(), 5, ordering=('-published_date',))
+
+    def test_deep_page_plan(self):
+        if connection.vendor != 'sqlite':
+            self.skipTest("EXPLAIN QUERY PLAN output is SQLite specific")
+        paginator = CursorPaginator(Post.objects.all(), 5)
+        values = paginator.decode_cursor(paginator.encode_cursor(self.expected[-3]))[1]
+        queryset = Post.objects.filter(paginator._after(paginator.ordering, values)).order_by(*paginator.ordering)[:6]
+        plan = queryset.explain()
+        self.assertIn("USING INDEX blog_post_published_idx (published_date<?)", plan)
+        self.assertNotIn("USE TEMP B-TREE FOR ORDER BY", plan)
+
+    def test_index_view(self):
+        response = self.client.get("/blog/")
+        self.assertEqual(list(response.context['latest_blog_list']), self.expected[:5])
+        response = self.client.get("/blog/", {'cursor': response.context['page_obj'].next_cursor})
+        self.assertEqual(list(response.context['latest_blog_list']), self.expected[5:10])
+        self.assertContains(response, "previous")
+        self.assertEqual(self.client.get("/blog/", {'cursor': 'x'}).status_code, 404)
+        self.assertEqual(self.client.get("/blog/", {'cursor': 'WzAsW251bGwsMV1d'}).status_code, 404)
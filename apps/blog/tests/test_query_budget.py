@@ -0,0 +1,126 @@
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from apps.blog import urls as blog_urls
+from apps.blog.models import Post, Tags
+from apps.blog.tests.tests import BasedTestCase
+from apps.polls import urls as polls_urls
+from apps.polls.models import Question
+
+# 每个视图（冷缓存）的查询次数预算，新增视图需要在这里设置预算
+QUERY_BUDGETS = {
+    'blog:index': 1,
+    # 文章和作者、标签
+    'blog:detail': 2,
+    'blog:tags': 2,
+    # 文章，已有的标签，INSERT
+    'blog:make': 3,
+    'blog:batch': 3,
+    'pons:index': 1,
+    'pons:home': 1,
+    # 问题、选项
+    'pons:detail': 2,
+    'pons:results': 2,
+    # 问题、选项，SAVEPOINT、两个 UPDATE、RELEASE SAVEPOINT
+    'pons:vote': 6,
+}
+
+
+@override_settings(INTERNAL_IPS=[])
+class QueryBudgetTest(BasedTestCase):
+    """
+    视图查询次数预算：查询次数必须等于预算，避免 N+1 查询等回归
+    """
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        user = User.objects.create(username="tom")
+        for i in range(3):
+            post = Post.objects.create(title=f"post {i}", content="content " * 100, author=user)
+            Tags.objects.bulk_create([Tags(post=post, tag_name=f"tag {j}") for j in range(5)])
+        self.post = post
+        for i in range(3):
+            question = Question.objects.create(question_text=f"question {i}", published_date=timezone.now())
+            choices = [question.choice_set.create(choice_text=f"choice {j}") for j in range(4)]
+        self.question, self.choice = question, choices[0]
+        self.requests = {
+            'blog:index': ('get', [], None),
+            'blog:detail': ('get', [self.post.id], None),
+            'blog:tags': ('get', [self.post.id], None),
+            'blog:make': ('post', [self.post.id], {'tag_name': 'new tag'}),
+            'blog:batch': ('post', [self.post.id], {'tag_name': ['tag 1, a, b', 'c\nd', 'e']}),
+            'pons:index': ('get', [], None),
+            'pons:home': ('get', [], None),
+            'pons:detail': ('get', [self.question.id], None),
+            'pons:results': ('get', [self.question.id], None),
+            'pons:vote': ('post', [self.question.id], {'choice': self.choice.id}),
+        }
+
+    def request(self, name: str):
+        method, args, data = self.requests[name]
+        with CaptureQueriesContext(connection) as context:
+            response = getattr(self.client, method)(reverse(name, args=args), data)
+        self.assertLess(response.status_code, 400, name)
+        return response, [query['sql'] for query in context.captured_queries]
+
+    def assertQueryBudget(self, name: str, budget: int = None):
+        budget = QUERY_BUDGETS[name] if budget is None else budget
+        response, queries = self.request(name)
+        self.assertEqual(len(queries), budget, f"{name} executed {len(queries)} queries, budget {budget}:\n"
+                         + "\n".join(queries))
+        return response, queries
+
+    def test_all_views_have_budget(self):
+        names = {f"{module.app_name}:{pattern.name}" for module in (blog_urls, polls_urls)
+                 for pattern in module.urlpatterns}
+        self.assertEqual(names, set(QUERY_BUDGETS))
+
+    def test_views(self):
+        for name in QUERY_BUDGETS:
+            with self.subTest(name):
+                cache.clear()
+                self.assertQueryBudget(name)
+
+    def test_cached_views(self):
+        for name in ('pons:index', 'pons:home', 'pons:detail', 'pons:results'):
+            with self.subTest(name):
+                self.request(name)
+                self.assertQueryBudget(name, 0)
+
+    def test_detail_view(self):
+        response, queries = self.assertQueryBudget('blog:detail')
+        self.assertIn('INNER JOIN "auth_user"', queries[0])
+        self.assertContains(response, "tag 4")
+        self.assertContains(response, "author: tom")
+
+    def test_tags_view(self):
+        response, queries = self.assertQueryBudget('blog:tags')
+        self.assertNotIn('"blog_post"."content"', queries[0])
+        self.assertContains(response, "tag 4")
+
+    def test_batch_view(self):
+        response, queries = self.assertQueryBudget('blog:batch')
+        self.assertRedirects(response, reverse('blog:tags', args=[self.post.id]))
+        # 已有的 tag 1 不重复插入
+        self.assertEqual(sorted(self.post.tags_set.values_list('tag_name', flat=True)),
+                         ['a', 'b', 'c', 'd', 'e'] + [f"tag {j}" for j in range(5)])
+
+        # 查询次数与标签数量无关
+        names = ", ".join(f"batch {i}" for i in range(50))
+        with CaptureQueriesContext(connection) as context:
+            self.client.post(reverse('blog:batch', args=[self.post.id]), {'tag_name': [names, names]})
+        self.assertEqual(len(context.captured_queries), QUERY_BUDGETS['blog:batch'])
+        self.assertEqual(self.post.tags_set.count(), 60)
+
+    def test_batch_view_invalid(self):
+        response = self.client.post(reverse('blog:batch', args=[0]), {'tag_name': 'a'})
+        self.assertEqual(response.status_code, 404)
+        response = self.client.post(reverse('blog:batch', args=[self.post.id]), {'tag_name': 'x' * 51})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(self.post.tags_set.count(), 5)
@@ -0,0 +1,75 @@
+import datetime
+from unittest import skipUnless
+
+from django.contrib.auth.models import User
+from django.db import connection
+
+from apps.blog.models import Post, Tags, Book, Reader, Club, Tree
+from apps.blog.tests.tests import BasedTestCase
+
+
+@skipUnless(connection.vendor == 'sqlite', "EXPLAIN QUERY PLAN output is SQLite specific")
+class QueryExplainTest(BasedTestCase):
+    """
+    热点查询的执行计划回归测试，参考 test_query_set_unreturn.test_explain
+        - SEARCH table USING INDEX：使用索引查找
+        - SEARCH table USING COVERING INDEX：覆盖索引，不需要回表
+        - SCAN table：全表扫描
+        - USE TEMP B-TREE FOR ORDER BY：使用临时 B-tree 排序
+    """
+
+    def setUp(self):
+        super().setUp()
+        user = User.objects.create(username="tom")
+        posts = Post.objects.bulk_create([Post(title=f"post {i}", content="content", author=user) for i in range(20)])
+        Tags.objects.bulk_create([Tags(post=post, tag_name=f"tag {i}") for post in posts for i in range(3)])
+        books = Book.objects.bulk_create([Book(title=f"book {i}", price=i) for i in range(10)])
+        readers = Reader.objects.bulk_create([Reader(reader_name=f"reader {i}") for i in range(10)])
+        Club.objects.bulk_create([Club(reader=reader, book=book, borrow_date=datetime.date(2024, 1, 1 + i))
+                                  for i, reader in enumerate(readers) for book in books[:i + 1]])
+        self.post, self.reader, self.book = posts[0], readers[5], books[2]
+
+    def assertPlan(self, queryset, index: str, covering: bool = False):
+        """
+        :param index: 索引名称（正则表达式）
+        :param covering: 是否必须是覆盖索引
+        """
+        plan = queryset.explain()
+        self.assertNotIn("USE TEMP B-TREE FOR ORDER BY", plan)
+        self.assertRegex(plan, f"USING {'COVERING ' if covering else '(COVERING )?'}INDEX {index}\\b")
+        return plan
+
+    def test_post_latest(self):
+        # blog.views.IndexView
+        plan = self.assertPlan(Post.objects.order_by('-published_date')[:5], 'blog_post_published_idx')
+        self.assertNotRegex(plan, r"(?m)SCAN blog_post$")
+
+    def test_tags_by_post(self):
+        # sqlite 建表时创建唯一约束，约束的索引名称为 sqlite_autoindex_blog_tags_N
+        post_tag = r'(blog_tags_post_tag_uniq|sqlite_autoindex_blog_tags_\d+)'
+        self.assertPlan(self.post.tags_set.all(), post_tag)
+        # 唯一约束和组合索引都可以用于 post 和 tag_name 等值查询
+        self.assertPlan(Tags.objects.filter(post=self.post, tag_name='tag 1'), f"({post_tag}|blog_tags_tag_post_idx)")
+
+    def test_tags_by_name(self):
+        self.assertPlan(Tags.objects.filter(tag_name='tag 1'), 'blog_tags_tag_post_idx')
+        self.assertPlan(Tags.objects.filter(tag_name='tag 1').values_list('post_id', flat=True),
+                        'blog_tags_tag_post_idx', covering=True)
+
+    def test_club_by_reader(self):
+        self.assertPlan(Club.objects.filter(reader=self.reader), 'blog_club_reader_book_idx')
+        self.assertPlan(Club.objects.filter(reader=self.reader, book=self.book), 'blog_club_reader_book_idx')
+        # 多对多查询读者的书
+        self.assertPlan(self.reader.books.all(), 'blog_club_reader_book_idx', covering=True)
+
+    def test_club_by_borrow_date(self):
+        self.assertPlan(Club.objects.filter(borrow_date__gte=datetime.date(2024, 1, 8)), 'blog_club_borrow_date_idx')
+        self.assertPlan(Club.objects.filter(borrow_date__range=(datetime.date(2024, 1, 2), datetime.date(2024, 1, 4)))
+                        .order_by('borrow_date'), 'blog_club_borrow_date_idx')
+
+    def test_tree_descendants(self):
+        # Tree.descendants() 是 path 索引上的范围查询
+        nodes = [Tree.objects.create(node="root")]
+        for i in range(20):
+            nodes.append(Tree.objects.create(node=f"node {i}", parent=nodes[i // 2]))
+        self.assertPlan(nodes[1].descendants(), r'blog_tree_path_\w+')
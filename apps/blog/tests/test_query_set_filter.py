@@ -348,7 +348,7 @@ class QueryFieldFuncTest(BasedTestCase):
         Tags.objects.create(tag_name='tag Test 2', post=self.post)
         Tags.objects.create(tag_name='tag test 3', post=self.post)
         Tags.objects.create(tag_name='tag test 4', post=self.post)
-        Tags.objects.create(tag_name='tag test 4', post=self.post)
+        Tags.objects.create(tag_name='tag test 5', post=self.post)
 
         Tags.objects.create(tag_name='Of Returning HTTP', post=self.post)
         Tags.objects.create(tag_name='error codes', post=self.post)
@@ -149,12 +149,14 @@ class QuerySetUnReturnTest(BasedTestCase):
         显示设置主键的优先插入或更新
         """
         print("----------------bulk_create--------------------")
+        # (post, tag_name) 唯一，使用新的文章避免和准备的数据冲突
+        post = Post.objects.create(title='this is bulk post.', content='this is content.', author=self.user)
         data = [
-            Tags(tag_name='tag test 1', post=self.post),
-            Tags(tag_name='tag test 2', post=self.post),
-            Tags(tag_name='tag test 3', post=self.post, id=222),
-            Tags(tag_name='tag test 4', post=self.post),
-            Tags(tag_name='tag test 5', post=self.post, id=111),
+            Tags(tag_name='tag test 1', post=post),
+            Tags(tag_name='tag test 2', post=post),
+            Tags(tag_name='tag test 3', post=post, id=222),
+            Tags(tag_name='tag test 4', post=post),
+            Tags(tag_name='tag test 5', post=post, id=111),
         ]
         # 一次性插入
         # Tags.objects.bulk_create(data)
@@ -162,11 +164,11 @@ class QuerySetUnReturnTest(BasedTestCase):
         # Tags.objects.bulk_create(data, batch_size=2)
 
         data = [
-            Tags(tag_name='tag test 1', post=self.post, id=1),
-            Tags(tag_name='tag test 2', post=self.post, id=2),
-            Tags(tag_name='tag test 3', post=self.post, id=222),
-            Tags(tag_name='tag test 4', post=self.post),
-            Tags(tag_name='tag test 5', post=self.post, id=111),
+            Tags(tag_name='tag test 1', post=post, id=1),
+            Tags(tag_name='tag test 2', post=post, id=2),
+            Tags(tag_name='tag test 3', post=post, id=222),
+            Tags(tag_name='tag test 4', post=post),
+            Tags(tag_name='tag test 5', post=post, id=111),
         ]
         # 插入时主突会忽略，继续插入
         # rs = Tags.objects.bulk_create(data, ignore_conflicts=True)
@@ -182,16 +184,18 @@ class QuerySetUnReturnTest(BasedTestCase):
         这个方法高效地更新提供的模型实例上的给定字段，通常只需一个查询，并返回更新的对象数量
         """
         print("----------------bulk_update--------------------")
+        # (post, tag_name) 唯一，同时更新文章避免和准备的数据冲突
+        post = Post.objects.create(title='this is bulk post.', content='this is content.', author=self.user)
 
         data = [
-            Tags(tag_name='tag test 1', post=self.post, id=1),
-            Tags(tag_name='tag test 2', post=self.post, id=2),
-            Tags(tag_name='tag test 3', post=self.post, id=222),
-            Tags(tag_name='tag test 4', post=self.post, id=3),
-            Tags(tag_name='tag test 5', post=self.post, id=111),
+            Tags(tag_name='tag test 1', post=post, id=1),
+            Tags(tag_name='tag test 2', post=post, id=2),
+            Tags(tag_name='tag test 3', post=post, id=222),
+            Tags(tag_name='tag test 4', post=post, id=3),
+            Tags(tag_name='tag test 5', post=post, id=111),
         ]
         # 批量更新必须有主键
-        Tags.objects.bulk_update(data, ['tag_name'], batch_size=2)
+        Tags.objects.bulk_update(data, ['tag_name', 'post'], batch_size=2)
 
         # 主键字段不能更新
         # Tags.objects.bulk_update(data, ['tag_name', 'id'], batch_size=2)
@@ -312,7 +316,7 @@ class QuerySetUnReturnTest(BasedTestCase):
         Tags.objects.create(tag_name='tag Test 2', post=self.post)
         Tags.objects.create(tag_name='tag test 3', post=self.post)
         Tags.objects.create(tag_name='tag test 4', post=self.post)
-        Tags.objects.create(tag_name='tag test 4', post=self.post)
+        Tags.objects.create(tag_name='tag test 5', post=self.post)
 
         Tags.objects.create(tag_name='Of Returning HTTP', post=self.post)
         Tags.objects.create(tag_name='error codes', post=self.post)
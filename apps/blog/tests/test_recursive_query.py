@@ -0,0 +1,102 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from apps.blog.models import Tree, Employee
+from apps.blog.tests.tests import BasedTestCase
+from common.util import recursive_query
+
+
+class RecursiveQueryTest(BasedTestCase):
+    """
+    WITH RECURSIVE 递归查询：一次查询得到所有子孙、祖先以及可达节点
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.root = Tree.objects.create(node='root')
+        self.python = Tree.objects.create(node='python', parent=self.root)
+        self.java = Tree.objects.create(node='java', parent=self.root)
+        self.django = Tree.objects.create(node='django', parent=self.python)
+        self.chain = [self.django]
+        for i in range(10):
+            self.chain.append(Tree.objects.create(node=f"level {i}", parent=self.chain[-1]))
+
+    def test_descendants(self):
+        with CaptureQueriesContext(connection) as context:
+            nodes = recursive_query.descendants(self.python)
+        self.assertEqual(len(context.captured_queries), 1)
+        self.assertIn("WITH RECURSIVE", context.captured_queries[0]['sql'])
+        self.assertEqual([(node.node, node.distance) for node in nodes],
+                         [('django', 1)] + [(f"level {i}", i + 2) for i in range(10)])
+
+        nodes = recursive_query.descendants(self.root, max_depth=2)
+        self.assertEqual([node.node for node in nodes], ['python', 'java', 'django'])
+        self.assertEqual(list(recursive_query.descendants(self.java)), [])
+
+    def test_ancestors(self):
+        with self.assertNumQueries(1):
+            nodes = list(recursive_query.ancestors(self.chain[-1]))
+        self.assertEqual([node.node for node in nodes],
+                         ['root', 'python', 'django'] + [f"level {i}" for i in range(9)])
+        self.assertEqual(nodes[0].distance, 12)
+        # 与物化路径的结果一致
+        self.assertEqual([node.id for node in nodes], [node.id for node in self.chain[-1].ancestors()])
+
+        nodes = recursive_query.ancestors(self.chain[-1], max_depth=2)
+        self.assertEqual([node.node for node in nodes], ['level 7', 'level 8'])
+        self.assertEqual(list(recursive_query.ancestors(self.root)), [])
+
+    def test_cycle(self):
+        # 有环的数据：root -> python -> root
+        Tree.objects.filter(pk=self.root.pk).update(parent=self.python)
+        with self.assertNumQueries(1):
+            nodes = list(recursive_query.descendants(self.root))
+        self.assertEqual(len(nodes), 13)
+        self.assertEqual([node.node for node in recursive_query.ancestors(self.root)], ['python'])
+
+    def test_reachable(self):
+        employees = [Employee.objects.create(name=f"e{i}") for i in range(6)]
+        # e0 - e1 - e2 - e3，e1 - e3，e4 - e5
+        employees[0].teams.add(employees[1])
+        employees[1].teams.add(employees[2], employees[3])
+        employees[2].teams.add(employees[3])
+        employees[4].teams.add(employees[5])
+
+        with self.assertNumQueries(1):
+            reachable = [(employee.name, employee.distance) for employee in recursive_query.reachable(employees[0], 'teams')]
+        self.assertEqual(reachable, [('e1', 1), ('e2', 2), ('e3', 2)])
+        self.assertEqual([employee.name for employee in recursive_query.reachable(employees[0], 'teams', max_depth=1)],
+                         ['e1'])
+        self.assertEqual([employee.name for employee in recursive_query.reachable(employees[5], 'teams')], ['e4'])
+
+    def test_reachable_cycle(self):
+        # 对称的多对多关系，环 e0 - e1 - ... - e19 - e0，每条边都是环，起点到最远节点的距离为 10
+        employees = [Employee.objects.create(name=f"e{i}") for i in range(20)]
+        for i, employee in enumerate(employees):
+            employee.teams.add(employees[(i + 1) % 20])
+
+        with self.assertNumQueries(1):
+            reachable = recursive_query.reachable(employees[0], 'teams')
+        self.assertEqual(len(reachable), 19)
+        self.assertEqual({employee.name: employee.distance for employee in reachable},
+                         {f"e{i}": min(i, 20 - i) for i in range(1, 20)})
+        self.assertEqual(reachable[-1].distance, 10)
+
+        # 递归部分每个节点只访问一次，递归次数不超过起点到最远节点的距离
+        m2m = Employee._meta.get_field('teams')
+        sql = recursive_query.graph_sql(Employee, m2m.remote_field.through._meta.db_table, m2m.m2m_column_name(),
+                                        m2m.m2m_reverse_name())
+        with connection.cursor() as cursor:
+            cursor.execute(f"{sql}SELECT COUNT(*), COUNT(DISTINCT id) FROM graph", [employees[0].pk])
+            self.assertEqual(cursor.fetchone(), (20, 20))
+
+        # 指定 max_depth 时只访问 max_depth 以内的节点：e0、e1、e19、e2、e18
+        with self.assertNumQueries(1):
+            reachable = recursive_query.reachable(employees[0], 'teams', max_depth=2)
+        self.assertEqual([(employee.name, employee.distance) for employee in reachable],
+                         [('e1', 1), ('e19', 1), ('e2', 2), ('e18', 2)])
+        sql = recursive_query.graph_sql(Employee, m2m.remote_field.through._meta.db_table, m2m.m2m_column_name(),
+                                        m2m.m2m_reverse_name(), max_depth=2)
+        with connection.cursor() as cursor:
+            cursor.execute(f"{sql}SELECT COUNT(DISTINCT id), MAX(depth) FROM graph", [employees[0].pk, 2])
+            self.assertEqual(cursor.fetchone(), (5, 2))
@@ -1,6 +1,8 @@
 from unittest import TestCase
 
-from apps.blog.models import Tree
+from django.template import Template, Context
+
+from apps.blog.models import Tree, TreeNode
 from apps.blog.tests.tests import BasedTestCase, sql_decorator
 
 
@@ -27,3 +29,159 @@ class TreeModelTest(BasedTestCase):
         node = Tree.objects.filter(node='java').first()
         print(node.children.all())
         print(node.parent)
+
+
+class TreePathTest(BasedTestCase):
+    """
+    物化路径：descendants()、ancestors()、subtree_as_nested_dict() 都只查询一次
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.root = Tree.objects.create(node='root')
+        self.java = Tree.objects.create(node='java', parent=self.root)
+        self.python = Tree.objects.create(node='python', parent=self.root)
+        self.django = Tree.objects.create(node='django', parent=self.python)
+        self.flask = Tree.objects.create(node='flask', parent=self.python)
+        # 12 层的分类
+        self.chain = [self.django]
+        for i in range(12):
+            self.chain.append(Tree.objects.create(node=f"level {i}", parent=self.chain[-1]))
+
+    def test_path(self):
+        self.assertEqual(self.root.path, '/')
+        self.assertEqual(self.django.path, f"/{self.root.id}/{self.python.id}/")
+        self.assertEqual(self.chain[-1].depth, 14)
+        self.assertEqual(Tree.objects.get(pk=self.django.pk).path, self.django.path)
+
+    def test_descendants(self):
+        with self.assertNumQueries(1):
+            self.assertEqual({node.node for node in self.python.descendants()},
+                             {'django', 'flask'} | {f"level {i}" for i in range(12)})
+        with self.assertNumQueries(1):
+            self.assertEqual(self.root.descendants(include_self=True).count(), 17)
+        self.assertFalse(self.flask.descendants().exists())
+
+    def test_descendants_prefix(self):
+        # id 为 1 的子孙节点不能包括 id 为 10、11 ... 的子孙节点
+        nodes = [Tree.objects.create(node=f"node {i}") for i in range(12)]
+        child = Tree.objects.create(node='child', parent=nodes[-1])
+        for node in nodes[:-1]:
+            self.assertFalse(node.descendants().exists())
+        self.assertEqual(list(nodes[-1].descendants()), [child])
+
+    def test_ancestors(self):
+        leaf = self.chain[-1]
+        with self.assertNumQueries(1):
+            breadcrumb = [node.node for node in leaf.ancestors(include_self=True)]
+        self.assertEqual(breadcrumb, ['root', 'python', 'django'] + [f"level {i}" for i in range(12)])
+        with self.assertNumQueries(0):
+            self.assertEqual(list(self.root.ancestors()), [])
+
+    def test_subtree_as_nested_dict(self):
+        with self.assertNumQueries(1):
+            tree = self.python.subtree_as_nested_dict()
+        self.assertEqual(tree['node'], 'python')
+        self.assertEqual([child['node'] for child in tree['children']], ['django', 'flask'])
+        depth, node = 0, tree['children'][0]
+        while node['children']:
+            depth, node = depth + 1, node['children'][0]
+        self.assertEqual((depth, node['node']), (12, 'level 11'))
+
+    def test_move(self):
+        # 移动节点时子孙节点的 path 一起修改
+        self.python.parent = self.java
+        self.python.save()
+        leaf = Tree.objects.get(pk=self.chain[-1].pk)
+        self.assertEqual([node.node for node in leaf.ancestors()][:4], ['root', 'java', 'python', 'django'])
+        self.assertEqual(self.java.descendants().count(), 15)
+
+        self.python.parent = None
+        self.python.save(update_fields=['parent'])
+        self.assertEqual(Tree.objects.get(pk=self.django.pk).path, f"/{self.python.id}/")
+
+        self.python.parent = self.chain[3]
+        with self.assertRaises(ValueError):
+            self.python.save()
+
+    def test_stale_parent(self):
+        # 加载之后父节点被移动，使用旧的父节点对象创建、移动节点
+        stale = Tree.objects.get(pk=self.django.pk)
+        moved = Tree.objects.get(pk=self.django.pk)
+        moved.parent = self.java
+        moved.save()
+        child = Tree.objects.create(node='orm', parent=stale)
+        self.assertEqual(child.path, f"/{self.root.id}/{self.java.id}/{self.django.id}/")
+        self.assertIn(child, self.java.descendants())
+
+        # 旧的节点对象不能移动到自己的子孙节点下
+        stale_python = Tree.objects.get(pk=self.python.pk)
+        self.chain[1].parent = self.root
+        self.chain[1].save()
+        node = Tree.objects.get(pk=self.chain[1].pk)
+        node.parent = self.chain[5]
+        with self.assertRaises(ValueError):
+            node.save()
+        # 拒绝移动时不修改对象的 path
+        self.assertEqual(node.path, f"/{self.root.id}/")
+        self.assertEqual(Tree.objects.get(pk=node.pk).path, f"/{self.root.id}/")
+        self.assertEqual(stale_python.descendants().count(), 1)
+
+        # b 加载之后被移动到 c 下，c.parent = 旧的 b 会形成环 c -> b -> c
+        c = Tree.objects.create(node='c', parent=self.root)
+        stale_b = Tree.objects.get(pk=self.flask.pk)
+        self.flask.parent = c
+        self.flask.save()
+        c.parent = stale_b
+        with self.assertRaises(ValueError):
+            c.save()
+        self.assertEqual(c.path, f"/{self.root.id}/")
+
+    def test_rebuild_paths(self):
+        Tree.objects.filter(pk=self.python.pk).update(parent=self.java)
+        self.assertEqual(Tree.rebuild_paths(), 15)
+        self.assertEqual(Tree.objects.get(pk=self.django.pk).path, f"/{self.root.id}/{self.java.id}/{self.python.id}/")
+        self.assertEqual(Tree.rebuild_paths(), 0)
+
+
+class TreeLoaderTest(BasedTestCase):
+    """
+    一次查询加载整个森林，node.children.all() 不再查询
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.root = Tree.objects.create(node='root')
+        for name, children in (('java', ['spring', 'struts']), ('python', ['django', 'flask'])):
+            parent = Tree.objects.create(node=name, parent=self.root)
+            for child in children:
+                Tree.objects.create(node=child, parent=parent)
+        self.other = Tree.objects.create(node='other')
+
+    def test_load_nodes(self):
+        with self.assertNumQueries(1):
+            roots = Tree.objects.load_nodes()
+        self.assertIsInstance(roots[0], TreeNode)
+        self.assertFalse(hasattr(roots[0], '__dict__'))
+        self.assertEqual([node.node for node in roots], ['root', 'other'])
+        self.assertEqual([[child.node for child in node.children] for node in roots[0].children],
+                         [['spring', 'struts'], ['django', 'flask']])
+
+    def test_load_forest(self):
+        template = Template("{% for node in nodes %}{{ node.node }}{% if node.parent %}<{{ node.parent.node }}{% endif %}"
+                            "[{% for child in node.children.all %}{{ child.node }}"
+                            "[{% for leaf in child.children.all %}{{ leaf.node }}<{{ leaf.parent.node }} {% endfor %}]"
+                            "{% endfor %}]{% endfor %}")
+        with self.assertNumQueries(1):
+            roots = Tree.objects.load_forest()
+            html = template.render(Context({'nodes': roots}))
+        self.assertEqual(html, "root[java[spring<java struts<java ]python[django<python flask<python ]]other[]")
+        # 预加载缓存上的 QuerySet 可以继续查询
+        self.assertEqual(list(roots[0].children.filter(node='java')), [roots[0].children.all()[0]])
+
+    def test_load_filtered_roots(self):
+        with self.assertNumQueries(2):
+            roots = Tree.objects.filter(node__in=['python', 'struts']).load_forest()
+            self.assertEqual([(node.node, [child.node for child in node.children.all()]) for node in roots],
+                             [('struts', []), ('python', ['django', 'flask'])])
+        self.assertEqual(Tree.objects.filter(node='missing').load_nodes(), [])
@@ -0,0 +1,84 @@
+from decimal import Decimal
+
+from django.db import connection
+from django.test import SimpleTestCase
+from django.test.utils import CaptureQueriesContext
+
+from apps.blog.models import Book, Author, Tags
+from apps.blog.tests.tests import BasedTestCase
+from common.util import utils
+
+
+class ModelToStringTest(SimpleTestCase):
+
+    def test_model_to_string(self):
+        book = Book(id=1, title="Mock Book Title", price=10, author_id=None)
+        self.assertEqual(utils.model_to_string(book), "id: 1, title: Mock Book *****, price: 10, author_id: None")
+        self.assertEqual(str(book), utils.model_to_string(book))
+        # 与 object_to_string 的区别只在于不输出 _state
+        self.assertEqual(utils.object_to_string(book), "_state: unknown, " + str(book))
+
+    def test_model_to_string_max_length(self):
+        tag = Tags(id=1, tag_name="a long tag name", post_id=2)
+        self.assertEqual(str(tag), "id: 1, tag_name: a long tag, post_id: 2")
+
+    def test_model_to_string_skip_caches(self):
+        book = Book(id=1, title="book", price=1)
+        book._prefetched_objects_cache = {'readers': ['reader']}
+        book.extra = 'annotation'
+        self.assertEqual(str(book), "id: 1, title: book, price: 1, author_id: None")
+
+    def test_lazy_string(self):
+        book = Book(id=1, title="book", price=1)
+        lazy = utils.lazy_string(book)
+        book.title = "changed"
+        self.assertEqual(str(lazy), "id: 1, title: changed, price: 1, author_id: None")
+
+
+class ModelToStringQueryTest(BasedTestCase):
+
+    def setUp(self):
+        super().setUp()
+        author = Author.objects.create(name="tom", age=30)
+        Book.objects.create(title="book", price=1, author=author)
+
+    def test_deferred_fields(self):
+        book = Book.objects.defer('title', 'price').get()
+        with CaptureQueriesContext(connection) as context:
+            text = str(book)
+        self.assertEqual(len(context), 0)
+        self.assertEqual(text, f"id: {book.id}, author_id: {book.author_id}")
+
+    def test_related_cache(self):
+        book = Book.objects.select_related('author').get()
+        with CaptureQueriesContext(connection) as context:
+            text = str(book)
+        self.assertEqual(len(context), 0)
+        self.assertNotIn('tom', text)
+
+
+class BoundedStringTest(SimpleTestCase):
+
+    def test_bounded(self):
+        book = Book(id=1, title="Mock Book Title", price=Decimal('1234567890.12'))
+        book._prefetched_objects_cache = {'readers': ['reader']}
+        book.tags = ['a', 'b']
+        self.assertEqual(utils.object_to_string(book, bounded=True),
+                         "id: 1, title: Mock Book *****, price: 1234567890***, author_id: None, tags: <list>")
+
+    def test_bounded_related_cache(self):
+        author = Author(id=1, name="tom")
+        book = Book(id=1, title="book", author=author)
+        with CaptureQueriesContext(connection) as context:
+            text = utils.object_to_string(book, bounded=True)
+        self.assertEqual(len(context), 0)
+        self.assertEqual(text, "id: 1, title: book, price: None, author_id: 1")
+
+    def test_bounded_budget(self):
+        book = Book(id=1, title="Mock Book Title", price=1, author_id=2)
+        self.assertEqual(utils.object_to_string(book, bounded=True, budget=35), "id: 1, title: Mock Book *****, ...")
+
+    def test_lazy_string_bounded(self):
+        item = type('Item', (), {})()
+        item.values = list(range(1000))
+        self.assertEqual(str(utils.lazy_string(item)), "values: <list>")
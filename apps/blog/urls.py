@@ -11,4 +11,5 @@ urlpatterns = [
     path(r'<int:pk>/', views.DetailView.as_view(), name='detail'),
     path(r'<int:pk>/tags/', views.TagsView.as_view(), name='tags'),
     path(r'<int:post_id>/tags/make/', views.make_tags, name='make'),
+    path(r'<int:post_id>/tags/batch/', views.make_tags_batch, name='batch'),
 ]
\ No newline at end of file
@@ -1,8 +1,13 @@
-from django.http import HttpResponseRedirect
+import re
+
+from django.core.paginator import InvalidPage
+from django.db.models import Prefetch
+from django.http import HttpResponseRedirect, Http404, HttpResponseBadRequest
 from django.shortcuts import get_object_or_404
 from django.urls import reverse
 from django.views import generic
 
+from common.util.paginator import CursorPaginator
 from .models import Post, Tags
 
 
@@ -10,20 +15,56 @@ from .models import Post, Tags
 class IndexView(generic.ListView):
     template_name = 'blog/post_list.html'
     context_object_name = 'latest_blog_list'
+    paginate_by = 5
 
     def get_queryset(self):
-        return Post.objects.order_by('-published_date')[:5]
+        return Post.objects.order_by('-published_date')
+
+    def paginate_queryset(self, queryset, page_size):
+        """
+        游标分页：?cursor=<page_obj.next_cursor>，翻到任意深度都只查询一页的数据
+        """
+        paginator = CursorPaginator(queryset, page_size, ordering=('-published_date', '-id'))
+        try:
+            page = paginator.page(self.request.GET.get('cursor'))
+        except InvalidPage as e:
+            raise Http404(str(e))
+        return paginator, page, page.object_list, page.has_other_pages()
 
 class DetailView(generic.DetailView):
     model = Post
     template_name = 'blog/detail.html'
 
+    def get_queryset(self):
+        # 作者和文章一次查询，标签一次查询
+        return Post.objects.select_related('author').prefetch_related('tags_set')
+
 class TagsView(generic.DetailView):
     model = Post
     template_name = 'blog/tags.html'
 
+    def get_queryset(self):
+        # 标签页不显示文章内容
+        return Post.objects.defer('content').prefetch_related(Prefetch('tags_set', queryset=Tags.objects.only('id', 'tag_name', 'post')))
+
 def make_tags(request, post_id):
     post = get_object_or_404(Post, pk=post_id)
-    Tags.objects.create(post=post, tag_name=request.POST["tag_name"])
+    # 已有的标签不重复添加，(post, tag_name) 唯一
+    Tags.add_tags(post.id, [request.POST["tag_name"]])
+
+    return HttpResponseRedirect(reverse("blog:tags", args=(post.id, )))
+
+def make_tags_batch(request, post_id):
+    """
+    批量添加标签：tag_name 可以提交多个，每个可以用逗号或者换行分隔多个标签
+    只校验一次文章，查询一次已有的标签，批量插入新的标签
+    """
+    names = [name for value in request.POST.getlist("tag_name") for name in re.split(r'[,\n]', value)]
+    max_length = Tags._meta.get_field('tag_name').max_length
+    if any(len(name.strip()) > max_length for name in names):
+        return HttpResponseBadRequest(f"tag name is longer than {max_length} characters")
+    if not Post.objects.filter(pk=post_id).exists():
+        raise Http404("No Post matches the given query.")
+    Tags.add_tags(post_id, names)
 
-    return HttpResponseRedirect(reverse("blog:tags", args=(post.id, )))
\ No newline at end of file
+    return HttpResponseRedirect(reverse("blog:tags", args=(post_id, )))
\ No newline at end of file
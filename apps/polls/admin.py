@@ -1,4 +1,8 @@
+import datetime
+
 from django.contrib import admin
+from django.db.models import Q
+from django.utils import timezone
 
 from apps.polls.models import Question, Choice
 
@@ -11,6 +15,24 @@ class ChoiceInline(admin.TabularInline):
     extra = 3
     classes = ['collapse']
 
+class PublishedRecentlyFilter(admin.SimpleListFilter):
+    """
+    按 was_published_recently 过滤，使用 published_date 索引的范围查询，不逐行调用方法
+    """
+    title = 'published recently'
+    parameter_name = 'recently'
+
+    def lookups(self, request, model_admin):
+        return [('yes', 'Yes'), ('no', 'No')]
+
+    def queryset(self, request, queryset):
+        if self.value() == 'yes':
+            return queryset.published_recently()
+        if self.value() == 'no':
+            now = timezone.now()
+            return queryset.filter(Q(published_date__lt=now - datetime.timedelta(days=1)) | Q(published_date__gt=now))
+        return queryset
+
 class QuestionAdmin(admin.ModelAdmin):
     fieldsets = [
         (None, {'fields': ['question_text']}),
@@ -18,7 +40,7 @@ class QuestionAdmin(admin.ModelAdmin):
     ]
     inlines = [ChoiceInline]
     list_display = ('question_text', 'published_date', 'was_published_recently')
-    list_filter = ['published_date']
+    list_filter = ['published_date', PublishedRecentlyFilter]
     search_fields = ['question_text']
 
 admin.site.register(Question, QuestionAdmin)
@@ -4,3 +4,8 @@ from django.apps import AppConfig
 class PollsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.polls'
+
+
+    def ready(self):
+        # 注册缓存失效的信号
+        from apps.polls import cache  # noqa: F401
@@ -0,0 +1,67 @@
+"""
+投票页面数据缓存
+    - 首页：最新的 5 个问题
+    - 详情页、结果页：问题及预加载的选项（prefetch_related('choice_set')）
+    问题保存、删除以及选项保存、删除时通过信号失效缓存，投票使用 UPDATE 不会触发信号，由投票方法调用 invalidate_question()
+"""
+from django.core.cache import cache
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from apps.polls.models import Question, Choice
+from common.util.paginator import CursorPage, CursorPaginator
+
+LATEST_QUESTIONS_KEY = 'polls:latest_questions'
+PER_PAGE = 5
+
+
+def question_key(question_id: int) -> str:
+    return f"polls:question:{question_id}"
+
+
+def latest_questions() -> list:
+    """
+    最新的 5 个问题，缓存命中时不查询数据库
+    """
+    return question_page().object_list
+
+
+def question_page(cursor: str = None) -> CursorPage:
+    """
+    按发布时间倒序游标分页，只缓存第一页
+    :raise InvalidPage: 游标无效
+    """
+    paginator = CursorPaginator(Question.objects.all(), PER_PAGE, ordering=('-published_date', '-id'))
+    if cursor is not None:
+        return paginator.page(cursor)
+    return cache.get_or_set(LATEST_QUESTIONS_KEY, paginator.page)
+
+
+def get_question(question_id: int) -> Question:
+    """
+    问题及预加载的选项，缓存命中时不查询数据库
+    :raise Question.DoesNotExist: 问题不存在
+    """
+    key = question_key(question_id)
+    question = cache.get(key)
+    if question is None:
+        question = Question.objects.prefetch_related('choice_set').get(pk=question_id)
+        cache.set(key, question)
+    return question
+
+
+def invalidate_question(*question_ids: int):
+    """
+    失效问题的缓存（投票、选项变化）
+    """
+    cache.delete_many([question_key(question_id) for question_id in question_ids])
+
+
+@receiver([post_save, post_delete], sender=Question)
+def _question_changed(sender, instance, **kwargs):
+    cache.delete_many([question_key(instance.pk), LATEST_QUESTIONS_KEY])
+
+
+@receiver([post_save, post_delete], sender=Choice)
+def _choice_changed(sender, instance, **kwargs):
+    invalidate_question(instance.question_id)
@@ -0,0 +1,28 @@
+# Generated by Django 5.1.15 on 2026-10-18 15:17
+
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
+
+
+def count_total_votes(apps, schema_editor):
+    Question = apps.get_model('polls', 'Question')
+    Choice = apps.get_model('polls', 'Choice')
+    votes = Choice.objects.filter(question=OuterRef('pk')).values('question').annotate(total=Sum('votes')).values('total')
+    Question.objects.update(total_votes=Coalesce(Subquery(votes), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('polls', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='question',
+            name='total_votes',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.RunPython(count_total_votes, migrations.RunPython.noop),
+    ]
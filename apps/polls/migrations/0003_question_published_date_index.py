@@ -0,0 +1,18 @@
+# Generated by Django 5.1.15 on 2026-10-18 15:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('polls', '0002_question_total_votes'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='question',
+            name='published_date',
+            field=models.DateTimeField(db_index=True, verbose_name='date published'),
+        ),
+    ]
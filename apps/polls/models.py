@@ -1,31 +1,84 @@
 import datetime
 
 from django.contrib import admin
-from django.db import models
+from django.db import models, transaction
+from django.db.models import F, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
 from django.utils import timezone
 
 from common.util import utils
 
 
 # Create your models here.
+class QuestionQuerySet(models.QuerySet):
+
+    def published_recently(self):
+        """
+        最近一天内发布的问题，published_date 上的索引范围查询
+        """
+        now = timezone.now()
+        return self.filter(published_date__gte=now - datetime.timedelta(days=1), published_date__lte=now)
+
+
 class Question(models.Model):
     question_text = models.CharField(max_length=200)
-    published_date = models.DateTimeField('date published')
+    # 首页按发布时间倒序，管理后台按发布时间过滤、排序
+    published_date = models.DateTimeField('date published', db_index=True)
+    # 冗余的投票总数，投票时与 Choice.votes 在同一个事务中原子更新，结果页不需要再汇总
+    # 只通过 UPDATE 修改：save() 不写入，选项保存、删除时重新汇总
+    total_votes = models.IntegerField(default=0)
+
+    objects = QuestionQuerySet.as_manager()
 
     __str__ = lambda self: f"title: {self.question_text}, date: {self.published_date}"
 
+    def save(self, *args, **kwargs):
+        # 修改已有的问题时不写回加载时的 total_votes，避免覆盖并发投票的 F() 递增
+        if not self._state.adding and kwargs.get('update_fields') is None and not kwargs.get('force_insert'):
+            kwargs['update_fields'] = [field.name for field in self._meta.concrete_fields
+                                       if not field.primary_key and field.name != 'total_votes']
+        super().save(*args, **kwargs)
+
+    @staticmethod
+    def refresh_total_votes(*question_ids: int):
+        """
+        按 Choice.votes 重新汇总 total_votes（管理后台修改、删除选项等不经过投票方法的变化）
+        """
+        votes = Choice.objects.filter(question_id=OuterRef('pk')).values('question_id').annotate(total=Sum('votes'))
+        Question.objects.filter(pk__in=question_ids).update(total_votes=Coalesce(Subquery(votes.values('total')), 0))
+
     @admin.display(
         boolean=True,
         ordering="published_date",
         description="Published recently?",
     )
     def was_published_recently(self):
-        return self.published_date >= timezone.now() - datetime.timedelta(days=1)
+        now = timezone.now()
+        return now - datetime.timedelta(days=1) <= self.published_date <= now
 
 class Choice(models.Model):
     question = models.ForeignKey(Question, on_delete=models.CASCADE)
     choice_text = models.CharField(max_length=200)
     votes = models.IntegerField(default=0)
 
+    @staticmethod
+    def vote(question_id, choice_id) -> bool:
+        """
+        投票：使用 F() 表达式在数据库中原子递增 Choice.votes 和 Question.total_votes，并发投票不会丢失
+        :return: 选项不属于该问题时返回 False
+        """
+        with transaction.atomic():
+            if not Choice.objects.filter(pk=choice_id, question_id=question_id).update(votes=F('votes') + 1):
+                return False
+            Question.objects.filter(pk=question_id).update(total_votes=F('total_votes') + 1)
+        return True
+
     def __str__(self):
-        return utils.object_to_string(self)
\ No newline at end of file
+        return utils.model_to_string(self)
+
+
+@receiver([post_save, post_delete], sender=Choice)
+def _choice_changed(sender, instance, **kwargs):
+    Question.refresh_total_votes(instance.question_id)
@@ -1,8 +1,14 @@
 import datetime
+from unittest import mock, skipUnless
 
-from django.test import TestCase
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.utils import timezone
-from .models import Question
+from .models import Question, Choice
+from . import vote_buffer
+from .vote_buffer import VoteBuffer
 
 
 class QuestionModelTests(TestCase):
@@ -35,3 +41,224 @@ class QuestionModelTests(TestCase):
         self.assertIs(recent_question.was_published_recently(), True)
 
 # Note: You will need to add the was_published_recently method to your Question model.
+
+
+@override_settings(INTERNAL_IPS=[])
+class VoteViewTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.question = Question.objects.create(question_text="question", published_date=timezone.now())
+        self.choices = [self.question.choice_set.create(choice_text=f"choice {i}") for i in range(2)]
+
+    def test_vote(self):
+        for choice in (self.choices[0], self.choices[0], self.choices[1]):
+            response = self.client.post(f"/polls/{self.question.id}/vote", {'choice': choice.id})
+            self.assertEqual(response.status_code, 302)
+        self.assertEqual([choice.votes for choice in Choice.objects.order_by('id')], [2, 1])
+        self.question.refresh_from_db()
+        self.assertEqual(self.question.total_votes, 3)
+
+    def test_vote_queries(self):
+        with CaptureQueriesContext(connection) as context:
+            self.client.post(f"/polls/{self.question.id}/vote", {'choice': self.choices[0].id})
+        updates = [query['sql'] for query in context.captured_queries if query['sql'].startswith('UPDATE')]
+        self.assertEqual(len(updates), 2)
+        self.assertIn('"votes" = ("polls_choice"."votes" + 1)', updates[0])
+        self.assertNotIn('choice_text', updates[0])
+
+    def test_vote_invalid_choice(self):
+        other = Question.objects.create(question_text="other", published_date=timezone.now())
+        other_choice = other.choice_set.create(choice_text="other")
+        for data in ({}, {'choice': 'x'}, {'choice': other_choice.id}):
+            response = self.client.post(f"/polls/{self.question.id}/vote", data)
+            self.assertContains(response, "You didn&#x27;t select a choice.")
+        self.assertEqual(Choice.objects.filter(votes__gt=0).count(), 0)
+        self.question.refresh_from_db()
+        self.assertEqual(self.question.total_votes, 0)
+
+
+@override_settings(INTERNAL_IPS=[])
+class VoteBufferTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.question = Question.objects.create(question_text="question", published_date=timezone.now())
+        self.choices = [self.question.choice_set.create(choice_text=f"choice {i}") for i in range(3)]
+        # 不启动定时写入的线程，由测试调用 flush()
+        self.buffer = VoteBuffer(flush_size=1000)
+        self.buffer.start = lambda: None
+
+    def test_flush(self):
+        for choice in self.choices[:2] * 50 + self.choices[:1]:
+            self.assertTrue(self.buffer.add(self.question.id, choice.id))
+        self.assertEqual(Choice.objects.filter(votes__gt=0).count(), 0)
+        with CaptureQueriesContext(connection) as context:
+            self.assertEqual(self.buffer.flush(), 101)
+        self.assertEqual(len([query for query in context.captured_queries if query['sql'].startswith('UPDATE')]), 2)
+        self.assertEqual([choice.votes for choice in Choice.objects.order_by('id')], [51, 50, 0])
+        self.question.refresh_from_db()
+        self.assertEqual(self.question.total_votes, 101)
+        self.assertEqual(self.buffer.flush(), 0)
+
+    def test_invalid_choice(self):
+        other = Question.objects.create(question_text="other", published_date=timezone.now())
+        self.assertFalse(self.buffer.add(other.id, self.choices[0].id))
+        self.assertFalse(self.buffer.add(self.question.id, 0))
+        self.assertEqual(self.buffer.pending, {})
+
+    def test_overlay(self):
+        self.buffer.add(self.question.id, self.choices[1].id)
+        self.buffer.add(self.question.id, self.choices[1].id)
+        question = Question.objects.prefetch_related('choice_set').get()
+        self.buffer.overlay(question, question.choice_set.all())
+        self.assertEqual([choice.votes for choice in question.choice_set.all()], [0, 2, 0])
+        self.assertEqual(question.total_votes, 2)
+
+    def test_overlay_during_flush(self):
+        for choice in self.choices[:2] * 2:
+            self.buffer.add(self.question.id, choice.id)
+        counts = []
+
+        def read_results():
+            question = Question.objects.prefetch_related('choice_set').get()
+            self.buffer.overlay(question, question.choice_set.all())
+            counts.append(([choice.votes for choice in question.choice_set.all()], question.total_votes))
+
+        # 写入到一半（UPDATE 之前、缓存失效之前）读取结果页，正在写入的投票不能丢失
+        delta = vote_buffer._delta
+        with mock.patch('apps.polls.vote_buffer._delta', side_effect=lambda deltas: (read_results(), delta(deltas))[1]), \
+                mock.patch('apps.polls.cache.invalidate_question', side_effect=lambda *ids: read_results()):
+            self.assertEqual(self.buffer.flush(), 4)
+        self.assertEqual(counts[0], ([2, 2, 0], 4))
+        for votes, total in counts:
+            self.assertGreaterEqual(total, 4)
+            self.assertTrue(all(vote >= 2 for vote in votes[:2]))
+        self.assertEqual(self.buffer.in_flight, {})
+        read_results()
+        self.assertEqual(counts[-1], ([2, 2, 0], 4))
+
+    def test_results_view(self):
+        with override_settings(POLLS_VOTE_BUFFER={'ENABLED': True}), \
+                mock.patch('apps.polls.vote_buffer._buffer', self.buffer):
+            self.client.post(f"/polls/{self.question.id}/vote", {'choice': self.choices[0].id})
+            response = self.client.get(f"/polls/{self.question.id}/results")
+        self.assertContains(response, "choice 0 -- 1 vote<")
+        self.assertContains(response, "<p>1 vote</p>")
+        self.assertEqual(Choice.objects.get(pk=self.choices[0].id).votes, 0)
+
+    def test_stop(self):
+        self.buffer.add(self.question.id, self.choices[2].id)
+        self.buffer.stop()
+        self.assertEqual(Choice.objects.get(pk=self.choices[2].id).votes, 1)
+
+
+@override_settings(INTERNAL_IPS=[])
+class PollsCacheTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.question = Question.objects.create(question_text="question", published_date=timezone.now())
+        self.choices = [self.question.choice_set.create(choice_text=f"choice {i}") for i in range(3)]
+
+    def test_index(self):
+        with self.assertNumQueries(1):
+            self.client.get("/polls/")
+        with self.assertNumQueries(0):
+            response = self.client.get("/polls/home")
+        self.assertContains(response, "question")
+        Question.objects.create(question_text="new question", published_date=timezone.now())
+        self.assertContains(self.client.get("/polls/"), "new question")
+
+    def test_index_pages(self):
+        now = timezone.now()
+        Question.objects.bulk_create([Question(question_text=f"old question {i}", published_date=now - datetime.timedelta(days=i + 1))
+                                      for i in range(6)])
+        first = self.client.get("/polls/").context['page_obj']
+        self.assertTrue(first.has_next())
+        with self.assertNumQueries(1):
+            second = self.client.get("/polls/", {'cursor': first.next_cursor}).context['page_obj']
+        self.assertEqual([question.question_text for question in second], ["old question 4", "old question 5"])
+        self.assertFalse(second.has_next())
+        self.assertEqual(self.client.get("/polls/", {'cursor': 'x'}).status_code, 404)
+        self.assertEqual(self.client.get("/polls/", {'cursor': 'WzAsW251bGwsMV1d'}).status_code, 404)
+
+    def test_detail(self):
+        with self.assertNumQueries(2):
+            self.client.get(f"/polls/{self.question.id}/")
+        with self.assertNumQueries(0):
+            response = self.client.get(f"/polls/{self.question.id}/")
+        self.assertContains(response, "choice 2")
+        self.question.choice_set.create(choice_text="choice 3")
+        self.assertContains(self.client.get(f"/polls/{self.question.id}/"), "choice 3")
+        self.assertEqual(self.client.get("/polls/0/").status_code, 404)
+
+    def test_results_after_vote(self):
+        self.client.get(f"/polls/{self.question.id}/results")
+        self.client.post(f"/polls/{self.question.id}/vote", {'choice': self.choices[1].id})
+        with self.assertNumQueries(2):
+            response = self.client.get(f"/polls/{self.question.id}/results")
+        self.assertContains(response, "choice 1 -- 1 vote<")
+        with self.assertNumQueries(0):
+            self.client.get(f"/polls/{self.question.id}/results")
+
+    def test_question_save(self):
+        self.client.get(f"/polls/{self.question.id}/")
+        self.question.question_text = "changed"
+        self.question.save()
+        self.assertContains(self.client.get(f"/polls/{self.question.id}/"), "changed")
+
+    def test_question_save_keeps_total_votes(self):
+        # 加载之后的投票不会被保存的旧值覆盖
+        question = Question.objects.get(pk=self.question.pk)
+        self.client.post(f"/polls/{self.question.id}/vote", {'choice': self.choices[0].id})
+        question.question_text = "changed"
+        question.save()
+        question.refresh_from_db()
+        self.assertEqual((question.question_text, question.total_votes), ("changed", 1))
+
+    def test_choice_change_refreshes_total_votes(self):
+        # 管理后台修改、删除选项时重新汇总 total_votes
+        self.choices[0].votes = 5
+        self.choices[0].save()
+        self.question.choice_set.create(choice_text="choice 2", votes=2)
+        self.question.refresh_from_db()
+        self.assertEqual(self.question.total_votes, 7)
+        self.choices[0].delete()
+        self.question.refresh_from_db()
+        self.assertEqual(self.question.total_votes, 2)
+
+
+@skipUnless(connection.vendor == 'sqlite', "EXPLAIN QUERY PLAN output is SQLite specific")
+class QuestionQueryPlanTests(TestCase):
+    """
+    首页、管理后台按 published_date 排序和过滤的查询必须使用索引：不能全表扫描，也不能使用临时 B-tree 排序
+    （管理后台追加的 -pk 排序只对 published_date 相同的行排序，即 USE TEMP B-TREE FOR RIGHT PART OF ORDER BY）
+    """
+
+    def setUp(self):
+        now = timezone.now()
+        Question.objects.bulk_create([Question(question_text=f"question {i}", published_date=now - datetime.timedelta(hours=i, minutes=30))
+                                      for i in range(100)])
+
+    def assertIndexed(self, queryset):
+        plan = queryset.explain()
+        self.assertNotRegex(plan, r"(?m)SCAN polls_question$")
+        self.assertNotIn("USE TEMP B-TREE FOR ORDER BY", plan)
+        self.assertIn("polls_question_published_date", plan)
+
+    def test_latest_questions(self):
+        self.assertIndexed(Question.objects.order_by('-published_date')[:5])
+
+    def test_published_recently(self):
+        self.assertIndexed(Question.objects.published_recently())
+        self.assertIndexed(Question.objects.published_recently().order_by('published_date'))
+
+    def test_admin_changelist(self):
+        self.assertIndexed(Question.objects.order_by('published_date', '-pk'))
+        self.assertIndexed(Question.objects.order_by('-published_date', '-pk'))
+
+    def test_published_recently_filter(self):
+        questions = Question.objects.published_recently()
+        self.assertEqual(questions.count(), 24)
+        self.assertTrue(all(question.was_published_recently() for question in questions))
@@ -1,46 +1,61 @@
 # Create your views here.
+from django.core.paginator import InvalidPage
 from django.http import HttpResponse, Http404, HttpResponseRedirect
-from django.shortcuts import render, get_object_or_404
+from django.shortcuts import render
 from django.template import loader
 from django.urls import reverse
 
-from apps.polls.models import Question, Choice
+from apps.polls import cache, vote_buffer
+from apps.polls.models import Question
 
 
 def index(request):
-    latest_question_list = Question.objects.order_by('-published_date')[:5]
+    # 游标分页，第一页和模板都有缓存，缓存命中时不查询数据库
+    try:
+        page = cache.question_page(request.GET.get('cursor'))
+    except InvalidPage as e:
+        raise Http404(str(e))
+    latest_question_list = page.object_list
     # content = ", ".join([q.question_text for q in latest_question_list])
 
     template = loader.get_template('polls/index.html')
-    context = {"latest_question_list": latest_question_list}
+    context = {"latest_question_list": latest_question_list, "page_obj": page}
 
     return HttpResponse(template.render(context, request))
 
 def home(request):
-    latest_question_list = Question.objects.order_by('-published_date')[:5]
+    latest_question_list = cache.latest_questions()
     context = {"latest_question_list": latest_question_list}
     return render(request, 'polls/index.html', context)
 
-def detail(request, question_id):
+def get_question_or_404(question_id):
+    """
+    问题及预加载的选项，模板中的 question.choice_set.all 不再查询
+    """
     try:
-        question = Question.objects.get(pk=question_id)
+        return cache.get_question(question_id)
     except Question.DoesNotExist:
         raise Http404("Question does not exist")
+
+def detail(request, question_id):
+    question = get_question_or_404(question_id)
     return render(request, 'polls/detail.html', {'question': question})
 
 def results(request, question_id):
-    question = get_object_or_404(Question, pk=question_id)
+    question = get_question_or_404(question_id)
+    buffer = vote_buffer.get_buffer()
+    if buffer is not None:
+        buffer.overlay(question, question.choice_set.all())
     return render(request, 'polls/results.html', {'question': question})
 
 def vote(request, question_id):
-    question = get_object_or_404(Question, pk=question_id)
+    question = get_question_or_404(question_id)
     try:
-        selected_choice = question.choice_set.get(pk=request.POST["choice"])
-    except (KeyError, Choice.DoesNotExist):
+        # 原子更新或者写入投票缓冲，不再读取后 selected_choice.votes += 1 保存所有字段
+        voted = vote_buffer.vote(question.id, int(request.POST["choice"]))
+    except (KeyError, ValueError):
+        voted = False
+    if not voted:
         return render(request, "polls/detail.html", {"question": question, "error_message": "You didn't select a choice.",})
-    else:
-        selected_choice.votes += 1
-        # selected_choice.votes = F("votes") + 1
-        selected_choice.save()
 
-    return HttpResponseRedirect(reverse("pons:results", args=(question.id, )))
\ No newline at end of file
+    return HttpResponseRedirect(reverse("pons:results", args=(question.id, )))
@@ -0,0 +1,171 @@
+"""
+投票写缓冲（write-behind）
+    投票先在进程内按 choice_id 累加，每隔 flush_interval 秒或者累计 flush_size 票时，
+    用一条批量 UPDATE 写入 Choice.votes，一条批量 UPDATE 写入 Question.total_votes，进程退出时写入剩余的投票
+    结果页通过 overlay() 加上还没有写入的投票（read-your-writes），包括正在写入、还没有提交和失效缓存的投票，
+    提交后到清除 in_flight 之间的很短时间内，从数据库读取的结果可能多计这部分投票
+
+    settings.POLLS_VOTE_BUFFER = {'ENABLED': True, 'FLUSH_INTERVAL': 0.5, 'FLUSH_SIZE': 100}
+    注意：缓冲在进程内，进程异常退出时会丢失最近 FLUSH_INTERVAL 秒内的投票，多进程部署时每个进程各自缓冲
+"""
+import atexit
+import logging
+import threading
+from collections import Counter
+
+from django.conf import settings
+from django.db import transaction, connections
+from django.db.models import F, Case, When, Value
+
+from apps.polls import cache
+from apps.polls.models import Choice, Question
+
+logger = logging.getLogger(__name__)
+
+
+class VoteBuffer:
+
+    def __init__(self, flush_interval: float = 0.5, flush_size: int = 100):
+        self.flush_interval = flush_interval
+        self.flush_size = flush_size
+        # choice_id -> 未写入的票数
+        self.pending = Counter()
+        # 正在写入的投票 choice_id -> 票数，提交并失效缓存后清除
+        self.in_flight = Counter()
+        # choice_id -> question_id
+        self.choices = {}
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopped = threading.Event()
+        self._thread = None
+
+    def add(self, question_id: int, choice_id: int) -> bool:
+        """
+        缓冲一票
+        :return: 选项不属于该问题时返回 False
+        """
+        if self.choices.get(choice_id) != question_id:
+            owner = Choice.objects.filter(pk=choice_id).values_list('question_id', flat=True).first()
+            if owner is None:
+                return False
+            self.choices[choice_id] = owner
+            if owner != question_id:
+                return False
+
+        with self._lock:
+            self.pending[choice_id] += 1
+            size = sum(self.pending.values())
+        self.start()
+        if size >= self.flush_size:
+            self._wakeup.set()
+        return True
+
+    def flush(self) -> int:
+        """
+        写入缓冲的投票
+        :return: 写入的票数
+        """
+        with self._flush_lock:
+            with self._lock:
+                deltas, self.pending = self.pending, Counter()
+                self.in_flight = deltas
+            if not deltas:
+                return 0
+
+            totals = Counter()
+            for choice_id, delta in deltas.items():
+                totals[self.choices[choice_id]] += delta
+            try:
+                with transaction.atomic():
+                    Choice.objects.filter(pk__in=deltas).update(votes=F('votes') + _delta(deltas))
+                    Question.objects.filter(pk__in=totals).update(total_votes=F('total_votes') + _delta(totals))
+            except Exception:
+                # 写入失败的投票放回缓冲，下次重试
+                with self._lock:
+                    self.pending.update(deltas)
+                    self.in_flight = Counter()
+                logger.exception("flush %s buffered votes failed", sum(deltas.values()))
+                return 0
+            try:
+                cache.invalidate_question(*totals)
+            finally:
+                with self._lock:
+                    self.in_flight = Counter()
+            return sum(deltas.values())
+
+    def overlay(self, question: Question, choices) -> None:
+        """
+        在查询结果上加上还没有写入以及正在写入的投票
+        :param question: 问题
+        :param choices: 问题的选项
+        """
+        with self._lock:
+            pending = {choice.id: self.pending.get(choice.id, 0) + self.in_flight.get(choice.id, 0) for choice in choices}
+        for choice in choices:
+            choice.votes += pending.get(choice.id, 0)
+        question.total_votes += sum(pending.values())
+
+    def start(self):
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name='vote-buffer', daemon=True)
+                    self._thread.start()
+                    atexit.register(self.stop)
+
+    def stop(self):
+        """
+        停止定时写入，并写入剩余的投票
+        """
+        self._stopped.set()
+        self._wakeup.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join()
+        self.flush()
+
+    def _run(self):
+        try:
+            while not self._stopped.is_set():
+                self._wakeup.wait(self.flush_interval)
+                self._wakeup.clear()
+                self.flush()
+        finally:
+            connections.close_all()
+
+
+def _delta(deltas: Counter) -> Case:
+    return Case(*[When(pk=pk, then=Value(delta)) for pk, delta in deltas.items()], default=Value(0))
+
+
+_buffer = None
+_buffer_lock = threading.Lock()
+
+
+def get_buffer() -> VoteBuffer | None:
+    """
+    settings.POLLS_VOTE_BUFFER 启用时返回进程内的投票缓冲，否则返回 None
+    """
+    global _buffer
+    config = getattr(settings, 'POLLS_VOTE_BUFFER', {})
+    if not config.get('ENABLED'):
+        return None
+    if _buffer is None:
+        with _buffer_lock:
+            if _buffer is None:
+                _buffer = VoteBuffer(config.get('FLUSH_INTERVAL', 0.5), config.get('FLUSH_SIZE', 100))
+    return _buffer
+
+
+def vote(question_id: int, choice_id: int) -> bool:
+    """
+    投票：启用投票缓冲时先写入缓冲，否则直接原子更新数据库
+    :return: 选项不属于该问题时返回 False
+    """
+    buffer = get_buffer()
+    if buffer is not None:
+        return buffer.add(question_id, choice_id)
+    if not Choice.vote(question_id, choice_id):
+        return False
+    cache.invalidate_question(question_id)
+    return True
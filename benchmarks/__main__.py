@@ -0,0 +1,139 @@
+"""
+common/util 性能基准套件
+    运行：python -m benchmarks [--quick] [--filter copy] [--save] [--threshold 0.2]
+    - 按 (width, size) 参数组合运行 benchmarks.suite 中注册的用例，输出每秒处理的对象数
+    - --save 将结果追加到 benchmarks/results/history.jsonl（按 git 提交记录），并与同一台机器、同一 Python 版本
+      最近一次保存的结果对比，变慢超过 threshold 的用例标记为 REGRESSION，--fail 时以非零状态退出
+"""
+import argparse
+import datetime
+import gc
+import json
+import os
+import platform
+import subprocess
+import sys
+import timeit
+
+import django
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'django_examples.settings')
+django.setup()
+
+from benchmarks.suite import BENCHMARKS, MAX_CELLS  # noqa: E402
+
+HISTORY = os.path.join(os.path.dirname(__file__), 'results', 'history.jsonl')
+QUICK_SIZE = 10_000
+
+
+def measure(func, min_time: float = 0.2, repeat: int = 3) -> float:
+    """
+    每次调用的最短耗时（秒），耗时较长的调用只执行一次
+    """
+    timer = timeit.Timer(func)
+    number, elapsed = timer.autorange()
+    if elapsed / number >= min_time:
+        return min([elapsed / number] + timer.repeat(repeat=repeat - 1, number=1))
+    return min(timer.repeat(repeat=repeat, number=number)) / number
+
+
+def run(names: list, quick: bool = False) -> dict:
+    results = {}
+    for name in names:
+        func, widths, sizes = BENCHMARKS[name]
+        for width in widths:
+            for size in sizes:
+                if width * size > MAX_CELLS or (quick and size > QUICK_SIZE):
+                    continue
+                target = func(width, size)
+                gc.collect()
+                seconds = measure(target)
+                key = f"{name}[width={width},size={size}]"
+                results[key] = {'seconds': seconds, 'ops': size / seconds}
+                print(f"{key:<50} {seconds * 1000:>12.3f} ms {size / seconds:>16,.0f} objects/s", flush=True)
+                del target
+    return results
+
+
+def revision() -> str:
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], text=True,
+                                       stderr=subprocess.DEVNULL).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+def environment() -> dict:
+    """
+    运行环境，不同机器、不同 Python 版本的结果不能直接对比
+    """
+    return {'python': platform.python_version(), 'machine': platform.node()}
+
+
+def load_last(env: dict) -> dict:
+    """
+    同一运行环境最近一次保存的结果
+    """
+    if not os.path.exists(HISTORY):
+        return {}
+    with open(HISTORY, encoding='utf-8') as file:
+        records = [json.loads(line) for line in file if line.strip()]
+    for record in reversed(records):
+        if all(record.get(key) == value for key, value in env.items()):
+            return record
+    return {}
+
+
+def save(results: dict, env: dict):
+    os.makedirs(os.path.dirname(HISTORY), exist_ok=True)
+    record = {
+        'revision': revision(),
+        'time': datetime.datetime.now().isoformat(timespec='seconds'),
+        **env,
+        'results': results,
+    }
+    with open(HISTORY, 'a', encoding='utf-8') as file:
+        file.write(json.dumps(record) + '\n')
+
+
+def compare(results: dict, last: dict, threshold: float) -> list:
+    """
+    与同一运行环境上一次保存的结果对比
+    :return: 变慢超过 threshold 的用例
+    """
+    regressions = []
+    previous = last.get('results', {})
+    if previous:
+        print(f"\ncompare with {last.get('revision')} ({last.get('time')})")
+    for key, result in results.items():
+        if key not in previous:
+            continue
+        change = result['seconds'] / previous[key]['seconds'] - 1
+        flag = 'REGRESSION' if change > threshold else ''
+        print(f"{key:<50} {change:>+8.1%} {flag}")
+        if flag:
+            regressions.append(key)
+    return regressions
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog='python -m benchmarks', description='common/util benchmarks')
+    parser.add_argument('--quick', action='store_true', help=f'skip list sizes over {QUICK_SIZE}')
+    parser.add_argument('--filter', default='', help='run benchmarks whose name contains this text')
+    parser.add_argument('--save', action='store_true', help='append results to the history file')
+    parser.add_argument('--threshold', type=float, default=0.2, help='slowdown ratio reported as regression')
+    parser.add_argument('--fail', action='store_true', help='exit with status 1 when regressions are found')
+    args = parser.parse_args(argv)
+
+    names = [name for name in BENCHMARKS if args.filter in name]
+    env = environment()
+    last = load_last(env)
+    results = run(names, args.quick)
+    regressions = compare(results, last, args.threshold)
+    if args.save:
+        save(results, env)
+    return 1 if regressions and args.fail else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
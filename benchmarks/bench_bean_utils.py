@@ -0,0 +1,122 @@
+"""
+BeanUtils 性能基准
+    运行：python -m benchmarks.bench_bean_utils [count]
+    对比复制计划缓存前（每次反射解析属性）与缓存后的 copy_properties 每秒复制次数
+"""
+import enum
+import sys
+import time
+import tracemalloc
+from dataclasses import dataclass
+
+from common.util.bean_utils import BeanUtils
+
+
+class Item:
+    def __init__(self, name=None, value=None):
+        self.name = name
+        self.value = value
+        self.price = 1.5
+        self.status = True
+
+
+class Record:
+    def __init__(self):
+        self.name = None
+        self.value = None
+        self.price = None
+        self.status = None
+
+
+@dataclass(slots=True)
+class SlotsRecord:
+    name: str = None
+    value: int = None
+    price: float = None
+    status: bool = None
+
+
+def reflective_copy_properties(source, target, mapping=None, skip_null=False):
+    """
+    缓存前的 copy_properties 实现：每次复制都遍历 __dict__，并执行 hasattr/mapping/类型检查
+    """
+    if not (isinstance(source, object) or isinstance(source, dict)):
+        raise TypeError("source must be an instance of custom object or dict")
+    if isinstance(target, type):
+        target = target()
+    elif not is_custom_object(target):
+        raise TypeError("target must be an instance of custom object")
+    if source is None or target is None:
+        raise ValueError("source or target must be not null value")
+    if mapping is None:
+        mapping = {}
+    if not hasattr(target, '__dict__'):
+        raise ValueError("target must be valid objects with __dict__ attribute")
+    source_dict = source if isinstance(source, dict) else source.__dict__
+
+    for key in source_dict:
+        target_key = mapping.get(key, key)
+        if hasattr(target, target_key):
+            value = source[key] if isinstance(source, dict) else getattr(source, key)
+            if skip_null and value is None:
+                continue
+            if is_custom_object(value) and not is_enum(value):
+                continue
+            setattr(target, target_key, value)
+    return target
+
+
+def is_custom_object(target):
+    return target.__class__.__module__ != 'builtins'
+
+
+def is_enum(target):
+    if isinstance(target, type):
+        return issubclass(target, enum.Enum)
+    return isinstance(target, enum.Enum)
+
+
+def measure(name, func, sources, target):
+    return measure_bulk(name, lambda: [func(source, target) for source in sources], len(sources))
+
+
+def measure_bulk(name, func, count):
+    start = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - start
+    print(f"{name:<24} {count:>10} copies  {elapsed:8.3f}s  {count / elapsed:>12,.0f} copies/s")
+    return elapsed
+
+
+def main(count=1_000_000):
+    sources = [Item(f"item {i}", i) for i in range(count)]
+    # 预热，生成复制计划
+    BeanUtils.copy_properties(sources[0], Record)
+
+    before = measure("reflective (before)", reflective_copy_properties, sources, Record)
+    after = measure("copy plan (after)", BeanUtils.copy_properties, sources, Record)
+    print(f"speedup: {before / after:.2f}x")
+
+    # 列表复制：逐个复制 vs 批量复制
+    before = measure_bulk("copy list (per item)", lambda: [BeanUtils.copy_properties(src, Record) for src in sources], count)
+    after = measure_bulk("copy_list (bulk)", lambda: BeanUtils.copy_list(sources, Record), count)
+    print(f"speedup: {before / after:.2f}x")
+
+    # __slots__ 类型通过构造函数一次性创建
+    measure_bulk("copy_list (slots)", lambda: BeanUtils.copy_list(sources, SlotsRecord), count)
+    for target in (Record, SlotsRecord):
+        tracemalloc.start()
+        records = BeanUtils.copy_list(sources[:10000], target)
+        size = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        print(f"{target.__name__:<24} {size / len(records):>10.0f} bytes/object")
+        del records
+
+    # values_list 行数据复制
+    fields = ('name', 'value', 'price', 'status')
+    rows = [(source.name, source.value, source.price, source.status) for source in sources]
+    measure_bulk("copy_rows (values_list)", lambda: BeanUtils.copy_rows(rows, fields, Record), count)
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
@@ -0,0 +1,79 @@
+"""
+游标分页与 Django Paginator（OFFSET 分页）对比
+    运行：python -m benchmarks.bench_paginator [count]
+    在临时的测试数据库中创建 count（默认 1000000）篇文章，比较不同深度的分页查询耗时
+    Paginator.page(n) 包括 COUNT(*) 查询和 LIMIT/OFFSET 查询，CursorPaginator.page(cursor) 只有一次索引范围查询
+"""
+import os
+import sys
+import time
+
+import django
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'django_examples.settings')
+django.setup()
+
+from django.contrib.auth.models import User  # noqa: E402
+from django.core.paginator import Paginator  # noqa: E402
+from django.db import connection  # noqa: E402
+
+from apps.blog.models import Post  # noqa: E402
+from common.util.paginator import CursorPaginator  # noqa: E402
+
+PER_PAGE = 20
+
+
+def prepare(count: int):
+    user = User.objects.create(username="bench")
+    batch = 10000
+    for start in range(0, count, batch):
+        Post.objects.bulk_create([Post(title=f"post {i}", content="content", author=user)
+                                  for i in range(start, min(start + batch, count))])
+    # bulk_create 时 auto_now 的发布时间都相同，按 id 设置不同的发布时间
+    with connection.cursor() as cursor:
+        cursor.execute("UPDATE blog_post SET published_date = datetime('2020-01-01', '+' || id || ' seconds')")
+        cursor.execute("ANALYZE")
+
+
+def measure(func, repeat: int = 5) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main(count: int):
+    start = time.perf_counter()
+    prepare(count)
+    print(f"prepared {count:,} posts in {time.perf_counter() - start:.1f}s")
+
+    queryset = Post.objects.order_by('-published_date', '-id')
+    paginator = Paginator(queryset, PER_PAGE)
+    cursor_paginator = CursorPaginator(Post.objects.all(), PER_PAGE, ordering=('-published_date', '-id'))
+    last = (count - 1) // PER_PAGE + 1
+
+    print(f"{'page':>10} {'Paginator':>14} {'CursorPaginator':>16}")
+    for number in sorted({1, 10, 1000, last // 2, last}):
+        if number < 1 or number > last:
+            continue
+        # 上一页的最后一行作为游标（不计时）
+        cursor = None
+        if number > 1:
+            cursor = cursor_paginator.encode_cursor(queryset[(number - 1) * PER_PAGE - 1])
+        offset = measure(lambda: list(paginator.page(number).object_list))
+        keyset = measure(lambda: list(cursor_paginator.page(cursor)))
+        assert list(paginator.page(number).object_list) == list(cursor_paginator.page(cursor))
+        print(f"{number:>10,} {offset * 1000:>11.2f} ms {keyset * 1000:>13.2f} ms")
+
+
+if __name__ == '__main__':
+    from django.test.utils import setup_test_environment
+
+    setup_test_environment()
+    old_name = connection.creation.create_test_db(verbosity=0)
+    try:
+        main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
@@ -0,0 +1,127 @@
+"""
+common/util 性能基准用例
+    每个用例按 (width, size) 参数组合运行，width 为对象属性数量，size 为列表长度
+    用例函数接收参数，返回需要计时的无参函数
+"""
+import copy
+
+from common.util import utils
+from common.util.bean_utils import BeanUtils
+
+WIDTHS = (5, 20, 50)
+SIZES = (1, 1_000, 100_000, 1_000_000)
+# width * size 超过该值的组合跳过，避免占用过多内存
+MAX_CELLS = 10_000_000
+
+BENCHMARKS = {}
+
+
+def benchmark(name: str, widths: tuple = WIDTHS, sizes: tuple = SIZES):
+    """
+    注册基准用例
+    """
+    def decorator(func):
+        BENCHMARKS[name] = (func, widths, sizes)
+        return func
+    return decorator
+
+
+def make_class(width: int, name: str = 'Bean') -> type:
+    """
+    创建 width 个属性的类，属性为 a0 ~ a{width-1}
+    """
+    names = [f"a{i}" for i in range(width)]
+
+    def __init__(self):
+        for attr in names:
+            setattr(self, attr, None)
+
+    return type(f"{name}{width}", (), {'__init__': __init__})
+
+
+def make_objects(width: int, size: int) -> list:
+    bean = make_class(width, 'Source')
+    objects = []
+    for i in range(size):
+        obj = bean()
+        obj.__dict__.update({f"a{j}": (f"value {i}" if j % 2 else i) for j in range(width)})
+        objects.append(obj)
+    return objects
+
+
+@benchmark('copy_properties')
+def copy_properties(width: int, size: int):
+    sources = make_objects(width, size)
+    target = make_class(width)
+    return lambda: [BeanUtils.copy_properties(source, target) for source in sources]
+
+
+@benchmark('copy.single', sizes=(1,))
+def copy_single(width: int, size: int):
+    source = make_objects(width, 1)[0]
+    target = make_class(width)
+    return lambda: BeanUtils.copy(source, target)
+
+
+@benchmark('copy.list')
+def copy_list(width: int, size: int):
+    sources = make_objects(width, size)
+    target = make_class(width)
+    return lambda: BeanUtils.copy(sources, target)
+
+
+@benchmark('copy.same_type')
+def copy_same_type(width: int, size: int):
+    sources = make_objects(width, size)
+    target = type(sources[0])
+    return lambda: [BeanUtils.copy(source, target) for source in sources]
+
+
+@benchmark('kget', widths=(5,))
+def kget(width: int, size: int):
+    sources = make_objects(width, size)
+    return lambda: BeanUtils.kget(sources, 'a1')
+
+
+@benchmark('iget', widths=(5,))
+def iget(width: int, size: int):
+    rows = [tuple(vars(source).values()) for source in make_objects(width, size)]
+    return lambda: BeanUtils.iget(rows, 1)
+
+
+@benchmark('object_to_string', sizes=(1, 1_000, 100_000))
+def object_to_string(width: int, size: int):
+    sources = make_objects(width, size)
+    return lambda: [utils.object_to_string(source) for source in sources]
+
+
+@benchmark('copy.stdlib_baseline', widths=(5,), sizes=(1_000,))
+def stdlib_baseline(width: int, size: int):
+    """
+    标准库 copy.copy 作为参照
+    """
+    sources = make_objects(width, size)
+    return lambda: [copy.copy(source) for source in sources]
+
+
+def make_models(size: int) -> list:
+    from apps.blog.models import Book
+    return [Book(id=i, title=f"Mock Book {i}", price=i, author_id=i) for i in range(size)]
+
+
+@benchmark('object_to_string.model', widths=(4,), sizes=(1, 1_000, 100_000))
+def object_to_string_model(width: int, size: int):
+    models = make_models(size)
+    return lambda: [utils.object_to_string(model) for model in models]
+
+
+@benchmark('model_to_string', widths=(4,), sizes=(1, 1_000, 100_000))
+def model_to_string(width: int, size: int):
+    models = make_models(size)
+    return lambda: [utils.model_to_string(model) for model in models]
+
+
+@benchmark('object_to_string.bounded', widths=(4,), sizes=(1, 1_000, 100_000))
+def object_to_string_bounded(width: int, size: int):
+    models = make_models(size)
+    return lambda: [utils.object_to_string(model, bounded=True) for model in models]
@@ -0,0 +1,46 @@
+from django.db import models
+from django.db.models import prefetch_related_objects
+from django.db.models.query import ModelIterable
+
+
+class _Batch(list):
+    """
+    同一次查询加载的对象，序列化、深复制时不携带其他对象
+    """
+
+    def __reduce__(self):
+        return _Batch, ()
+
+    def __repr__(self):
+        return f"<batch of {len(self)}>"
+
+
+class BatchQuerySet(models.QuerySet):
+    """
+    查询结果中的对象属于同一个批次，配合 batch_prefetch 使用：
+    某个对象第一次访问没有预加载的关联数据时，一次查询为整个批次预加载，避免 __str__ 等逐个访问关联数据的 N+1 查询
+        objects = BatchQuerySet.as_manager()
+    """
+
+    def _fetch_all(self):
+        fetched = self._result_cache is not None
+        super()._fetch_all()
+        if not fetched and self._iterable_class is ModelIterable and len(self._result_cache) > 1:
+            batch = _Batch(self._result_cache)
+            for obj in batch:
+                obj._state.batch = batch
+
+
+def batch_prefetch(obj: models.Model, lookup: str):
+    """
+    为对象所在的批次预加载多对多、反向外键关联数据，已经预加载（prefetch_related）的对象以及不属于批次的单个对象不做处理
+        ", ".join(book.title for book in batch_prefetch(self, 'books').books.all())
+    :param obj: 模型对象
+    :param lookup: 关联属性名称
+    :return: obj
+    """
+    if lookup not in getattr(obj, '_prefetched_objects_cache', ()):
+        batch = getattr(obj._state, 'batch', None)
+        if batch and any(item is obj for item in batch):
+            prefetch_related_objects(batch, lookup)
+    return obj
@@ -0,0 +1,138 @@
+import logging
+import threading
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterable, Iterator, Mapping
+
+logger = logging.getLogger('common.util.bean_utils')
+
+
+class CopyDiagnostics:
+    """
+    BeanUtils 复制诊断，按 (source type, target type) 统计 target 缺失的属性、复制失败的属性，以及同类型复制的次数
+        - 同一个属性只在第一次出现时输出日志，之后只计数，quiet=True 时不输出，统一由 report() 汇总输出
+        - counts() 返回统计结果，可作为监控指标
+    """
+
+    def __init__(self, quiet: bool = False):
+        self.quiet = quiet
+        # (source type, target type, property) -> count
+        self.missing = Counter()
+        self.errors = Counter()
+        # target type -> count
+        self.same_type = Counter()
+        self._lock = threading.Lock()
+
+    def record_missing(self, source_type: type, target_type: type, keys: Mapping[str, int] | Iterable[str]):
+        """
+        记录 target 没有对应属性的 source 属性
+        :param keys: property -> count 或者 property 列表（每个计数 1 次）
+        """
+        if not isinstance(keys, Mapping):
+            keys = Counter(keys)
+        if not keys:
+            return
+        with self._lock:
+            for key, count in keys.items():
+                counter_key = (source_type, target_type, key)
+                if counter_key not in self.missing and not self.quiet:
+                    logger.warning("target object %s does not have property %s (source %s)",
+                                   _name(target_type), key, _name(source_type))
+                self.missing[counter_key] += count
+
+    def record_error(self, source_type: type, target_type: type, key: str, error: Exception):
+        """
+        记录复制失败的属性，例如 getattr 或 setattr 抛出 AttributeError
+        """
+        with self._lock:
+            counter_key = (source_type, target_type, key)
+            if counter_key not in self.errors and not self.quiet:
+                logger.warning("copying property %s from %s to %s failed: %s",
+                               key, _name(source_type), _name(target_type), error)
+            self.errors[counter_key] += 1
+
+    def record_same_type(self, target_type: type):
+        """
+        记录 source 和 target 是同类型的复制
+        """
+        with self._lock:
+            if target_type not in self.same_type and not self.quiet:
+                logger.info("source and target are same type %s", _name(target_type))
+            self.same_type[target_type] += 1
+
+    def counts(self) -> dict:
+        """
+        统计结果
+        :return: {'missing': {'Source -> Target': {property: count}}, 'errors': {...}, 'same_type': {'Target': count}}
+        """
+        with self._lock:
+            return {
+                'missing': _group(self.missing),
+                'errors': _group(self.errors),
+                'same_type': {_name(target_type): count for target_type, count in self.same_type.items()},
+            }
+
+    def report(self, level: int = logging.WARNING) -> dict:
+        """
+        一次性输出汇总的统计结果
+        :param level: 日志级别
+        :return: 统计结果
+        """
+        counts = self.counts()
+        for title, groups in (('missing properties', counts['missing']), ('copy errors', counts['errors'])):
+            for types, keys in groups.items():
+                logger.log(level, "%s %s: %s", types, title,
+                           ", ".join(f"{key} x {count}" for key, count in keys.items()))
+        for target_type, count in counts['same_type'].items():
+            logger.log(level, "same type copies %s: %s", target_type, count)
+        return counts
+
+    def reset(self):
+        with self._lock:
+            self.missing.clear()
+            self.errors.clear()
+            self.same_type.clear()
+
+
+def _name(klass: type) -> str:
+    return klass.__qualname__
+
+
+def _group(counter: Counter) -> dict:
+    groups = {}
+    for (source_type, target_type, key), count in counter.items():
+        groups.setdefault(f"{_name(source_type)} -> {_name(target_type)}", {})[key] = count
+    return groups
+
+
+# 进程默认的诊断，collect() 中使用独立的诊断
+_default = CopyDiagnostics()
+_current = ContextVar('bean_diagnostics', default=_default)
+
+
+def current() -> CopyDiagnostics:
+    """
+    当前上下文使用的复制诊断
+    """
+    return _current.get()
+
+
+@contextmanager
+def collect(report: bool = True, level: int = logging.WARNING) -> Iterator[CopyDiagnostics]:
+    """
+    在上下文中单独统计复制诊断，不逐条输出日志，退出时一次性汇总输出
+        with collect() as diagnostics:
+            BeanUtils.copy_list(books, BookDTO)
+        diagnostics.counts()
+    :param report: 退出时是否输出汇总结果
+    :param level: 汇总结果的日志级别
+    """
+    diagnostics = CopyDiagnostics(quiet=True)
+    token = _current.set(diagnostics)
+    try:
+        yield diagnostics
+    finally:
+        _current.reset(token)
+        if report:
+            diagnostics.report(level)
@@ -1,14 +1,22 @@
+import array
 import copy
+import dataclasses
 import enum
 import inspect
+import math
+import types
+import typing
+from collections import Counter
 from enum import IntEnum
 from operator import attrgetter, itemgetter
-from typing import List
+from typing import Iterable, Iterator, List, Sequence
 
+from django.core.exceptions import FieldDoesNotExist
 from django.db import models
+from django.db.models import QuerySet
 from django.db.models.enums import Choices
 
-from common.util import utils
+from common.util import bean_diagnostics, utils
 
 
 class BeanUtils:
@@ -38,29 +46,238 @@ class BeanUtils:
         return list(map(itemgetter(index), target))
 
     @staticmethod
-    def copy_properties(source: dict | object | List[object] | List[dict], target: object | type, mapping: dict = None, skip_null: bool = False) -> object | List[object]:
+    def kget_many(target: Iterable | QuerySet, *keys: str, columns: bool = False) -> list[tuple] | dict[str, list]:
+        """
+        get the values of multiple keys in the target objects in one pass, keys support dotted paths, e.g. author.name
+        when target is QuerySet:
+            - keys that are model columns or forward relation paths are fetched by values_list(*lookups) without model instantiation
+            - otherwise the relation paths of dotted keys are fetched by select_related
+        :param target: target object iterable or QuerySet
+        :param keys: the keys of the target object
+        :param columns: return a dict of key -> column values instead of row tuples
+        :return: row tuples in the order of keys, or dict of key -> column values
+        """
+        if not keys:
+            raise ValueError("at least one key must be provided")
+
+        if isinstance(target, QuerySet):
+            lookups = [BeanUtils.__lookup(target.model, key) for key in keys]
+            if all(lookups):
+                rows = list(target.values_list(*lookups))
+            else:
+                relations = [lookup for lookup in (BeanUtils.__relation(target.model, key) for key in keys) if lookup]
+                if relations:
+                    target = target.select_related(*relations)
+                rows = BeanUtils.__rows(target, keys)
+        else:
+            rows = BeanUtils.__rows(target, keys)
+
+        if columns:
+            return {key: list(values) for key, values in zip(keys, zip(*rows) if rows else ([] for _ in keys))}
+        return rows
+
+    @staticmethod
+    def __rows(target: Iterable, keys: tuple) -> list[tuple]:
+        getter = attrgetter(*keys)
+        if len(keys) == 1:
+            return [(value,) for value in map(getter, target)]
+        return list(map(getter, target))
+
+    @staticmethod
+    def __lookup(model: type[models.Model], key: str) -> str | None:
+        """
+        将属性路径 author.name 转换为 values_list 的查询路径 author__name，
+        只支持一对一/多对一的正向关联，最后一级必须是数据库列（字段名或外键的 attname）
+        """
+        *relations, column = key.split('.')
+        for name in relations:
+            field = BeanUtils.__forward_relation(model, name)
+            if field is None:
+                return None
+            model = field.related_model
+        if not BeanUtils.__is_column(model, column):
+            return None
+        return '__'.join(relations + [column])
+
+    @staticmethod
+    def __relation(model: type[models.Model], key: str) -> str | None:
+        """
+        属性路径 author.studio.name 中可以 select_related 的关联路径 author__studio，
+        属性本身是正向关联时包括属性，例如 author -> author
+        """
+        relations = []
+        for name in key.split('.'):
+            field = BeanUtils.__forward_relation(model, name)
+            if field is None:
+                break
+            relations.append(name)
+            model = field.related_model
+        return '__'.join(relations) or None
+
+    @staticmethod
+    def __forward_relation(model: type[models.Model], name: str):
+        try:
+            field = model._meta.get_field(name)
+        except FieldDoesNotExist:
+            return None
+        if field.concrete and (field.many_to_one or field.one_to_one):
+            return field
+        return None
+
+    @staticmethod
+    def kget_iter(target: Iterable | QuerySet, key: str, chunk_size: int = 2000) -> Iterator:
+        """
+        lazily get the value of the key in the target objects one at a time, key supports dotted paths, e.g. author.name
+        when target is QuerySet:
+            - key that is a model column or forward relation path is fetched by values_list(lookup, flat=True)
+            - otherwise the relation path of key is fetched by select_related
+        :param target: target object iterable or QuerySet
+        :param key: the key of the target object
+        :param chunk_size: number of rows fetched from database per batch when target is QuerySet
+        :return: the value iterator of the key in the target object
+        """
+        if isinstance(target, QuerySet):
+            lookup = BeanUtils.__lookup(target.model, key)
+            if lookup:
+                return target.values_list(lookup, flat=True).iterator(chunk_size=chunk_size)
+            target = BeanUtils.__select_related(target, key)
+        return map(attrgetter(key), BeanUtils.__iterate(target, chunk_size))
+
+    @staticmethod
+    def iget_iter(target: Iterable[tuple] | QuerySet, index: int, chunk_size: int = 2000) -> Iterator:
+        """
+        lazily get the value of the index in the target tuples one at a time
+        :param target: target tuple iterable or values_list QuerySet
+        :param index: the index of the target tuple
+        :param chunk_size: number of rows fetched from database per batch when target is QuerySet
+        :return: the value iterator of the index in the target tuple
+        """
+        return map(itemgetter(index), BeanUtils.__iterate(target, chunk_size))
+
+    @staticmethod
+    def kget_array(target: Iterable | QuerySet, key: str, typecode: str = 'd', null: int | float = None) -> array.array:
+        """
+        get the value of the key in the target objects as a typed array.array, key supports dotted paths, e.g. author.age
+        when target is QuerySet and key is a model column or forward relation path, only the column is fetched by values_list
+        :param target: target object iterable or QuerySet
+        :param key: the key of the target object
+        :param typecode: array.array typecode, e.g. 'd' (float), 'q' (int)
+        :param null: sentinel value of None, default is nan for float typecodes, None values of int typecodes raise ValueError
+        :return: typed array of the values
+        """
+        return BeanUtils.__to_array(BeanUtils.__column(target, key), typecode, null)
+
+    @staticmethod
+    def iget_array(target: Iterable[tuple] | QuerySet, index: int, typecode: str = 'd', null: int | float = None) -> array.array:
+        """
+        get the value of the index in the target tuples as a typed array.array
+        :param target: target tuple iterable or values_list QuerySet
+        :param index: the index of the target tuple
+        :param typecode: array.array typecode, e.g. 'd' (float), 'q' (int)
+        :param null: sentinel value of None, default is nan for float typecodes, None values of int typecodes raise ValueError
+        :return: typed array of the values
+        """
+        return BeanUtils.__to_array(list(map(itemgetter(index), target)), typecode, null)
+
+    @staticmethod
+    def kget_ndarray(target: Iterable | QuerySet, key: str, dtype='float64', null: int | float = None):
+        """
+        get the value of the key in the target objects as a numpy array, numpy is required
+        :param target: target object iterable or QuerySet
+        :param key: the key of the target object
+        :param dtype: numpy dtype
+        :param null: sentinel value of None, default is nan for float dtypes, None values of other dtypes raise ValueError
+        :return: numpy array of the values
+        """
+        return BeanUtils.__to_ndarray(BeanUtils.__column(target, key), dtype, null)
+
+    @staticmethod
+    def iget_ndarray(target: Iterable[tuple] | QuerySet, index: int, dtype='float64', null: int | float = None):
+        """
+        get the value of the index in the target tuples as a numpy array, numpy is required
+        :param target: target tuple iterable or values_list QuerySet
+        :param index: the index of the target tuple
+        :param dtype: numpy dtype
+        :param null: sentinel value of None, default is nan for float dtypes, None values of other dtypes raise ValueError
+        :return: numpy array of the values
+        """
+        return BeanUtils.__to_ndarray(list(map(itemgetter(index), target)), dtype, null)
+
+    @staticmethod
+    def __column(target: Iterable | QuerySet, key: str) -> list:
+        """
+        读取一列属性值，QuerySet 的数据库列（包括关联路径 author.age）直接通过 values_list 读取，不创建模型对象
+        """
+        if isinstance(target, QuerySet):
+            lookup = BeanUtils.__lookup(target.model, key)
+            if lookup:
+                return list(target.values_list(lookup, flat=True))
+            target = BeanUtils.__select_related(target, key)
+        return list(map(attrgetter(key), target))
+
+    @staticmethod
+    def __select_related(target: QuerySet, key: str) -> QuerySet:
+        relation = BeanUtils.__relation(target.model, key)
+        return target.select_related(relation) if relation else target
+
+    @staticmethod
+    def __fill_null(values: list, null, floating: bool) -> list:
+        if None not in values:
+            return values
+        if null is None:
+            if not floating:
+                raise ValueError("values contain None, the null sentinel value must be provided")
+            null = math.nan
+        return [null if value is None else value for value in values]
+
+    @staticmethod
+    def __to_array(values: list, typecode: str, null) -> array.array:
+        return array.array(typecode, BeanUtils.__fill_null(values, null, typecode in 'fd'))
+
+    @staticmethod
+    def __to_ndarray(values: list, dtype, null):
+        try:
+            import numpy
+        except ImportError:
+            raise ImportError("numpy is required to get values as numpy array, install it with: pip install numpy")
+        dtype = numpy.dtype(dtype)
+        values = BeanUtils.__fill_null(values, null, dtype.kind in 'fc')
+        return numpy.fromiter(values, dtype=dtype, count=len(values))
+
+    @staticmethod
+    def copy_properties(source: dict | object | List[object] | List[dict], target: object | type, mapping: dict = None, skip_null: bool = False, nested: bool = False) -> object | List[object]:
         """
         copy properties from source to target
         :param source: source is custom bean object or dict type
-        :param target: target object is custom bean object
+        :param target: target object is custom bean object, dataclass/NamedTuple/attrs/__slots__ object or class type
         :param mapping: mapping of source object properties to target object properties
         :param skip_null: skip null value
-        :return: target object
+        :param nested: recursively copy nested objects into the nested target types declared by target annotations
+        :return: target object, immutable targets (e.g. frozen dataclass, NamedTuple) are created as new objects
         """
+        if nested:
+            return BeanUtils.__copy_nested(source, target, mapping, skip_null, {})
         if not (isinstance(source, object) or isinstance(source, dict)):
             raise TypeError("source must be an instance of custom object or dict")
 
+        in_place, layout = False, None
         if isinstance(target, type):
-            target = BeanUtils.__create_instance(target)
+            target_type = target
+            target = BeanUtils.__new_target(target)
         elif not BeanUtils.__is_custom_object(target):
             raise TypeError("target must be an instance of custom object")
-        if source is None or target is None:
+        else:
+            target_type = type(target)
+            if _target_builder(target_type) is not None:
+                # 已有的可变 dataclass/attrs/__slots__ 对象原地复制属性
+                in_place = _is_mutable(target)
+            elif hasattr(target, '__dict__'):
+                # 普通对象按实例的属性布局解析 target 属性
+                layout = tuple(target.__dict__)
+            else:
+                raise ValueError("target must be valid objects with __dict__ attribute")
+        if source is None:
             raise ValueError("source or target must be not null value")
-        if mapping is None:
-            mapping = {}
-
-        if not hasattr(target, '__dict__'):
-            raise ValueError("target must be valid objects with __dict__ attribute")
         if isinstance(source, dict):
             source_dict = source
         elif not hasattr(source, '__dict__'):
@@ -68,30 +285,55 @@ class BeanUtils:
         else:
             source_dict = source.__dict__
 
-        for key in source_dict:
-            target_key = mapping.get(key, key)
+        plan = BeanUtils.get_plan(type(source), target_type, mapping, skip_null, in_place, layout)
+        return plan.copy(source, source_dict, target)
 
-            # 检查 target 是否有 target_key 属性
-            if hasattr(target, target_key):
-                try:
-                    if isinstance(source, dict):
-                        value = source[key]
-                    else:
-                        value = getattr(source, key)
+    @staticmethod
+    def get_plan(source_type: type, target_type: type, mapping: dict = None, skip_null: bool = False, in_place: bool = False, layout: tuple = None) -> '_CopyPlan':
+        """
+        get the cached copy plan of source type to target type, create it if not exists
+        :param source_type: source object class type
+        :param target_type: target object class type
+        :param mapping: mapping of source object properties to target object properties
+        :param skip_null: skip null value
+        :param in_place: update existing mutable dataclass/attrs/__slots__ instances instead of creating new objects by constructor
+        :param layout: attribute names (__dict__ keys) of the existing target instance, the target properties are resolved
+                       against the class attributes and these names, None for the target instances created from target type
+        :return: copy plan
+        """
+        key = (source_type, target_type, tuple(mapping.items()) if mapping else (), skip_null, in_place, layout)
+        try:
+            return _plans[key]
+        except KeyError:
+            plan = _plans[key] = _CopyPlan(source_type, target_type, mapping, skip_null, in_place)
+            return plan
 
-                    if skip_null and value is None:
-                        continue
-                    if BeanUtils.__is_custom_object(value) and not BeanUtils.__is_enum(value):
-                        continue
-                    setattr(target, target_key, value)
-                except AttributeError as e:
-                    # 处理 getattr 或 setattr 抛出的异常
-                    print(f"Error: copying property {key} to {target_key}: {e}")
-            else:
-                # 如果 target 没有 target_key 属性，记录警告
-                print(f"Warning: target object does not have property {target_key}")
+    @staticmethod
+    def clear_plans():
+        """
+        clear the cached copy plans, e.g. after the target class has been changed dynamically
+        """
+        _plans.clear()
 
-        return target
+    @staticmethod
+    def diagnostics() -> bean_diagnostics.CopyDiagnostics:
+        """
+        get the copy diagnostics of current context, which counts missing properties, copy errors and same type copies
+        :return: copy diagnostics
+        """
+        return bean_diagnostics.current()
+
+    @staticmethod
+    def collect_diagnostics(report: bool = True):
+        """
+        collect the copy diagnostics within the context and report them once at the end
+            with BeanUtils.collect_diagnostics() as diagnostics:
+                BeanUtils.copy_list(books, BookDTO)
+            print(diagnostics.counts())
+        :param report: report the collected diagnostics when exiting the context
+        :return: context manager of copy diagnostics
+        """
+        return bean_diagnostics.collect(report)
 
     @staticmethod
     def copy(source: dict | object | List[object] | List[dict], target: object | type) -> object | List[object]:
@@ -102,13 +344,269 @@ class BeanUtils:
         :return: target object
         """
         if isinstance(source, list):
-            return list(map(lambda src: BeanUtils.copy_properties(src, target), source))
+            return BeanUtils.copy_list(source, target)
         elif isinstance(target, type) and type(source) is target:
-            print("source and target are same type")
+            bean_diagnostics.current().record_same_type(target)
             return copy.copy(source)
         else:
             return BeanUtils.copy_properties(source, target)
 
+    @staticmethod
+    def copy_list(source: List[object] | List[dict], target: type, mapping: dict = None, skip_null: bool = False, nested: bool = False) -> List[object]:
+        """
+        copy a list of source objects to new target objects in one pass,
+        the target type is validated and the copy plan is resolved only once, missing properties are recorded once per call
+        :param source: list of source objects or dicts
+        :param target: target object class type
+        :param mapping: mapping of source object properties to target object properties
+        :param skip_null: skip null value
+        :param nested: recursively copy nested objects, shared nested objects are copied only once across the list
+        :return: target object list
+        """
+        if nested:
+            memo = {}
+            return [BeanUtils.__copy_nested(src, target, mapping, skip_null, memo) for src in source]
+        if not isinstance(target, type):
+            return [BeanUtils.copy_properties(src, target, mapping, skip_null) for src in source]
+
+        return list(BeanUtils.__copy_each(source, target, mapping, skip_null))
+
+    @staticmethod
+    def copy_iter(source: Iterable[object] | Iterable[dict] | QuerySet, target: type, mapping: dict = None, skip_null: bool = False, chunk_size: int = 2000) -> Iterator[object]:
+        """
+        lazily copy source objects to new target objects one at a time, the memory usage stays flat for large results
+        :param source: iterable of source objects or dicts, QuerySet is fetched by QuerySet.iterator(chunk_size)
+        :param target: target object class type
+        :param mapping: mapping of source object properties to target object properties
+        :param skip_null: skip null value
+        :param chunk_size: number of rows fetched from database per batch when source is QuerySet
+        :return: target object iterator
+        """
+        if not isinstance(target, type):
+            raise TypeError("target must be a custom object class type")
+        return BeanUtils.__copy_each(BeanUtils.__iterate(source, chunk_size), target, mapping, skip_null)
+
+    @staticmethod
+    def __copy_each(source: Iterable, target: type, mapping: dict, skip_null: bool) -> Iterator[object]:
+        instance = BeanUtils.__new_target(target)
+        construct = instance is None
+
+        plans = {}
+        missing = {}
+        plan = source_type = None
+        for src in source:
+            if type(src) is not source_type:
+                source_type = type(src)
+                if source_type not in plans:
+                    if src is None:
+                        raise ValueError("source or target must be not null value")
+                    if not (issubclass(source_type, dict) or hasattr(src, '__dict__')):
+                        raise ValueError("source must be valid objects with __dict__ attribute")
+                    plans[source_type] = BeanUtils.get_plan(source_type, target, mapping, skip_null)
+                    missing[source_type] = Counter()
+                plan = plans[source_type]
+                plan_missing = missing[source_type]
+
+            if instance is None and not construct:
+                instance = target()
+            yield plan.copy(src, src if isinstance(src, dict) else src.__dict__, instance, plan_missing)
+            instance = None
+
+        for source_type, plan in plans.items():
+            plan.warn(missing[source_type])
+
+    @staticmethod
+    def __copy_nested(source, target: object | type, mapping: dict | None, skip_null: bool, memo: dict) -> object:
+        """
+        嵌套复制，memo 记录已复制的 (source, target type) -> (source, target)：
+            - 共享的嵌套对象只复制一次
+            - 循环引用指向同一个 target，通过构造函数创建的 target 在创建后回填循环引用（tuple/set 和 NamedTuple 中无法回填，为 None）
+        """
+        target_type = target if isinstance(target, type) else type(target)
+        key = (_memo_key(source), target_type)
+        if key in memo:
+            return memo[key][1]
+
+        if source is None:
+            raise ValueError("source or target must be not null value")
+        if isinstance(source, dict):
+            source_dict = source
+        elif hasattr(source, '__dict__'):
+            source_dict = source.__dict__
+        else:
+            raise ValueError("source must be valid objects with __dict__ attribute")
+
+        in_place, layout = False, None
+        if not isinstance(target, type):
+            if _target_builder(target_type) is not None:
+                in_place = _is_mutable(target)
+            else:
+                layout = tuple(target.__dict__)
+        plan = BeanUtils.get_plan(type(source), target_type, mapping, skip_null, in_place, layout)
+        instance = BeanUtils.__new_target(target) if isinstance(target, type) else target
+        memo[key] = (source, instance if plan.builder is None else _Pending())
+
+        values = plan.collect(source, source_dict, instance)
+        nested_values = {}
+        # 引用了创建中的 target：(name, index, pending)
+        pending_refs = []
+        inverse = {target_key: key for key, target_key in mapping.items()} if mapping else {}
+        for name, (container, nested_type) in _nested_fields(target_type).items():
+            source_key = inverse.get(name, name)
+            related_key = _related_memo_key(source, source_key)
+            if related_key is not None and (related_key, nested_type) in memo:
+                value = memo[(related_key, nested_type)][1]
+            else:
+                value = source.get(source_key, _MISSING) if isinstance(source, dict) else getattr(source, source_key, _MISSING)
+                if value is _MISSING or (value is None and skip_null):
+                    continue
+                if value is None:
+                    nested_values[name] = None
+                    continue
+                if container is None:
+                    if not (isinstance(value, dict) or hasattr(value, '__dict__')):
+                        continue
+                    value = BeanUtils.__copy_nested(value, nested_type, None, skip_null, memo)
+                else:
+                    if isinstance(value, models.Manager):
+                        value = value.all()
+                    items = [BeanUtils.__copy_nested(item, nested_type, None, skip_null, memo) for item in value]
+                    for index, item in enumerate(items):
+                        if isinstance(item, _Pending):
+                            pending_refs.append((name, index, item))
+                            items[index] = None
+                    value = items if container is list else container(items)
+
+            if isinstance(value, _Pending):
+                pending_refs.append((name, None, value))
+                value = None
+            nested_values[name] = value
+
+        if plan.builder is not None:
+            result = plan.write(instance, {**values, **nested_values})
+        else:
+            result = plan.write(instance, values)
+            for name, value in nested_values.items():
+                setattr(result, name, value)
+
+        for name, index, pending in pending_refs:
+            pending.refs.append((result, name, index))
+        pending = memo[key][1]
+        memo[key] = (source, result)
+        if isinstance(pending, _Pending):
+            pending.resolve(result)
+        return result
+
+    @staticmethod
+    def __iterate(source: Iterable | QuerySet, chunk_size: int) -> Iterator:
+        """
+        QuerySet 使用 iterator(chunk_size) 分批读取，不缓存结果
+        """
+        if isinstance(source, QuerySet):
+            return source.iterator(chunk_size=chunk_size)
+        return iter(source)
+
+    @staticmethod
+    def copy_rows(rows: Iterable[tuple], fields: Sequence[str], target: type, mapping: dict = None, skip_null: bool = False) -> List[object]:
+        """
+        copy row tuples, e.g. QuerySet.values_list(*fields), to new target objects in one pass
+        :param rows: row tuples, values are in the order of fields
+        :param fields: property names of the row values
+        :param target: target object class type
+        :param mapping: mapping of field names to target object properties
+        :param skip_null: skip null value
+        :return: target object list
+        """
+        if not isinstance(target, type):
+            raise TypeError("target must be a custom object class type")
+        fields = tuple(fields)
+        instance = BeanUtils.__new_target(target)
+        construct = instance is None
+
+        plan = BeanUtils.get_plan(dict, target, mapping, skip_null)
+        for field in fields:
+            if field not in plan.resolved:
+                plan.resolve(field, instance)
+        copier = plan.compile(fields, row=True)
+
+        result = []
+        for row in rows:
+            if instance is None and not construct:
+                instance = target()
+            result.append(copier(None, row, instance))
+            instance = None
+
+        plan.warn(Counter({key: len(result) for key in copier.missing}))
+        return result
+
+    @staticmethod
+    def copy_columns(columns: dict[str, list], target: type, mapping: dict = None, skip_null: bool = False) -> List[object]:
+        """
+        copy column-oriented data, e.g. {'title': [...], 'price': [...]}, to new target objects in one pass
+        :param columns: property name -> column values, all columns must have the same length
+        :param target: target object class type
+        :param mapping: mapping of column names to target object properties
+        :param skip_null: skip null value
+        :return: target object list
+        """
+        if len(set(map(len, columns.values()))) > 1:
+            raise ValueError("columns must have the same length")
+        return BeanUtils.copy_rows(zip(*columns.values()), columns.keys(), target, mapping, skip_null)
+
+    @staticmethod
+    def project(source: QuerySet | type[models.Model], target: type, mapping: dict = None, skip_null: bool = False) -> List[object]:
+        """
+        project model rows to new target objects without model instantiation,
+        only the columns that have matching target properties are fetched by values_list(*columns)
+        :param source: QuerySet or model class
+        :param target: target object class type
+        :param mapping: mapping of model field (attname, e.g. author_id) to target object properties
+        :param skip_null: skip null value
+        :return: target object list
+        """
+        if isinstance(source, type) and issubclass(source, models.Model):
+            source = source._default_manager.all()
+        if not isinstance(source, QuerySet):
+            raise TypeError("source must be a QuerySet or model class")
+        if not isinstance(target, type):
+            raise TypeError("target must be a custom object class type")
+
+        columns = BeanUtils.project_columns(source.model, target, mapping)
+        if not columns:
+            raise ValueError(f"target {target} does not have any property of model {source.model.__name__}")
+        return BeanUtils.copy_rows(source.values_list(*columns), columns, target, mapping, skip_null)
+
+    @staticmethod
+    def project_columns(model: type[models.Model], target: type, mapping: dict = None) -> tuple:
+        """
+        get the model columns that have matching target properties
+        :param model: model class
+        :param target: target object class type
+        :param mapping: mapping of model field (attname, e.g. author_id) to target object properties
+        :return: model column names
+        """
+        instance = BeanUtils.__new_target(target)
+        plan = BeanUtils.get_plan(dict, target, mapping)
+        columns = []
+        for field in model._meta.concrete_fields:
+            column = field.attname
+            target_key = plan.resolved[column] if column in plan.resolved else plan.resolve(column, instance)
+            if target_key is not None:
+                columns.append(column)
+        return tuple(columns)
+
+    @staticmethod
+    def __new_target(target: type) -> object | None:
+        """
+        创建用于复制属性的 target 实例，通过构造函数一次性创建的类型（dataclass 等）返回 None
+        """
+        if _target_builder(target) is not None:
+            return None
+        instance = BeanUtils.__create_instance(target)
+        if not hasattr(instance, '__dict__'):
+            raise ValueError("target must be valid objects with __dict__ attribute")
+        return instance
+
     @staticmethod
     def __create_instance(target):
         if isinstance(target, type):
@@ -120,6 +618,16 @@ class BeanUtils:
             raise TypeError("target must be an instance of custom object")
         return target
 
+    @staticmethod
+    def __is_column(model: type[models.Model], key: str) -> bool:
+        """
+        key 是否是模型的数据库列（字段名或外键的 attname），列值可以直接通过 values_list 读取
+        """
+        for field in model._meta.concrete_fields:
+            if key == field.attname:
+                return True
+        return False
+
     @staticmethod
     def __is_custom_object(target):
         return target.__class__.__module__ != 'builtins'
@@ -139,6 +647,451 @@ class BeanUtils:
         print(BeanUtils.__is_enum(value), type(value))
 
 
+# 复制计划缓存 (source type, target type, mapping, skip_null, in_place, layout) -> _CopyPlan
+_plans = {}
+# target 类型的构造方式缓存 target type -> _TargetBuilder | None
+_builders = {}
+# target 类型的嵌套对象属性缓存 target type -> {name: (container, nested type)}
+_nested = {}
+# 嵌套复制时 source 没有对应属性
+_MISSING = object()
+# 可复制的值类型（内置类型和枚举）与需要跳过的值类型（自定义对象），按值类型缓存检查结果
+_copyable_types = set()
+_skipped_types = set()
+
+
+def _is_skipped_type(value_type: type) -> bool:
+    """
+    非内置类型且非枚举的值（自定义对象）不进行复制
+    """
+    if value_type in _copyable_types:
+        return False
+    if value_type in _skipped_types:
+        return True
+    # 值本身是枚举类时，其类型为 EnumMeta
+    if value_type.__module__ != 'builtins' and not issubclass(value_type, (enum.Enum, enum.EnumMeta)):
+        _skipped_types.add(value_type)
+        return True
+    _copyable_types.add(value_type)
+    return False
+
+
+def _nested_fields(target_type: type) -> dict:
+    """
+    target 类型注解中的嵌套对象属性 name -> (container, nested type)，container 为 list/tuple/set 等集合类型，单个对象为 None
+    """
+    try:
+        return _nested[target_type]
+    except KeyError:
+        pass
+
+    try:
+        hints = typing.get_type_hints(target_type)
+    except Exception:
+        # 无法解析的注解（如局部类的字符串注解）不进行嵌套复制
+        hints = {}
+    fields = {}
+    for name, hint in hints.items():
+        container = None
+        hint = _strip_optional(hint)
+        origin = typing.get_origin(hint)
+        if origin in (list, tuple, set, frozenset):
+            args = [arg for arg in typing.get_args(hint) if arg is not Ellipsis]
+            if len(args) != 1:
+                continue
+            container, hint = origin, _strip_optional(args[0])
+        if _is_bean_type(hint):
+            fields[name] = (container, hint)
+
+    _nested[target_type] = fields
+    return fields
+
+
+def _strip_optional(hint):
+    """
+    Optional[X] / X | None -> X
+    """
+    if typing.get_origin(hint) in (typing.Union, types.UnionType):
+        args = [arg for arg in typing.get_args(hint) if arg is not type(None)]
+        if len(args) == 1:
+            return args[0]
+    return hint
+
+
+def _is_bean_type(hint) -> bool:
+    """
+    可以嵌套复制的自定义对象类型，不包括内置类型、枚举以及 datetime/Decimal 等没有 __dict__ 的值类型
+    """
+    return (isinstance(hint, type) and hint.__module__ != 'builtins' and not issubclass(hint, enum.Enum)
+            and (hint.__dictoffset__ != 0 or _target_builder(hint) is not None))
+
+
+class _Pending:
+    """
+    嵌套复制中创建中的 target（通过构造函数创建，无法提前创建），记录引用它的对象，创建后回填
+    """
+    __slots__ = ('refs',)
+
+    def __init__(self):
+        # (引用对象, 属性名, list 下标 | None)
+        self.refs = []
+
+    def resolve(self, target: object):
+        for owner, name, index in self.refs:
+            if index is not None:
+                value = getattr(owner, name)
+                if isinstance(value, list):
+                    value[index] = target
+                continue
+            try:
+                setattr(owner, name, target)
+            except AttributeError:
+                # frozen dataclass/attrs 对象
+                try:
+                    object.__setattr__(owner, name, target)
+                except AttributeError:
+                    pass
+
+
+def _memo_key(source) -> object:
+    """
+    嵌套复制的 memo key，模型对象按 (模型类, 主键)，同一条数据的不同实例只复制一次，其他对象按 id
+    """
+    if isinstance(source, models.Model) and source.pk is not None:
+        return type(source), source.pk
+    return id(source)
+
+
+def _related_memo_key(source, name: str) -> tuple | None:
+    """
+    模型外键（一对一/多对一）属性对应的 memo key，已复制过的关联对象不需要再次查询数据库
+    """
+    if not isinstance(source, models.Model):
+        return None
+    try:
+        field = source._meta.get_field(name)
+    except FieldDoesNotExist:
+        return None
+    if not (field.concrete and (field.many_to_one or field.one_to_one)):
+        return None
+    related_model = field.related_model
+    value = getattr(source, field.attname)
+    if value is None or field.target_field != related_model._meta.pk:
+        return None
+    return related_model, value
+
+
+def _data_descriptors(klass: type) -> frozenset:
+    """
+    类中定义的数据描述符（如 property、FileField），读写这些属性时必须经过 getattr/setattr
+    """
+    return frozenset(
+        name for base in klass.__mro__ for name, attr in vars(base).items()
+        if hasattr(type(attr), '__set__')
+    )
+
+
+class _TargetBuilder:
+    """
+    通过构造函数一次性创建的 target 类型：dataclass（包括 frozen）、NamedTuple、attrs 类，
+    以及没有 __dict__ 的 __slots__ 类（构造函数不接收属性参数时，创建后逐个 setattr）
+    """
+    __slots__ = ('target_type', 'fields', 'params', 'construct')
+
+    def __init__(self, target_type: type, fields: tuple, params: tuple = None, construct: bool = True):
+        self.target_type = target_type
+        # 可以复制的属性
+        self.fields = frozenset(fields)
+        # 属性对应的构造函数参数名，None 表示和属性名相同
+        self.params = dict(zip(fields, params)) if params and params != fields else None
+        self.construct = construct
+
+    def build(self, values: dict, target: object = None) -> object:
+        """
+        使用复制的属性值创建 target，传入已有的 target 时，没有复制的属性保留原值
+        """
+        if not self.construct:
+            if target is None:
+                target = self.target_type()
+            for key, value in values.items():
+                setattr(target, key, value)
+            return target
+
+        if target is not None:
+            values = {**{key: getattr(target, key) for key in self.fields if hasattr(target, key)}, **values}
+        if self.params:
+            values = {self.params[key]: value for key, value in values.items()}
+        try:
+            return self.target_type(**values)
+        except TypeError as e:
+            raise TypeError(f"Failed to create {self.target_type} instance with properties {list(values)}: {e}")
+
+
+def _is_mutable(target: object) -> bool:
+    """
+    已有的 target 实例是否可以原地复制属性：不是 frozen 的 dataclass/attrs 对象以及 __slots__ 对象，NamedTuple 不可修改
+    """
+    if isinstance(target, tuple):
+        return False
+    target_type = type(target)
+    params = getattr(target_type, '__dataclass_params__', None)
+    if params is not None and params.frozen:
+        return False
+    return getattr(target_type.__setattr__, '__name__', None) != '_frozen_setattrs'
+
+
+def _target_builder(target_type: type) -> _TargetBuilder | None:
+    """
+    target 类型的构造方式，普通的带 __dict__ 的类返回 None，先创建实例再复制属性
+    """
+    try:
+        return _builders[target_type]
+    except KeyError:
+        pass
+
+    builder = None
+    if dataclasses.is_dataclass(target_type):
+        builder = _TargetBuilder(target_type, tuple(f.name for f in dataclasses.fields(target_type) if f.init))
+    elif issubclass(target_type, tuple) and hasattr(target_type, '_fields'):
+        builder = _TargetBuilder(target_type, target_type._fields)
+    elif hasattr(target_type, '__attrs_attrs__'):
+        attributes = [a for a in target_type.__attrs_attrs__ if a.init]
+        builder = _TargetBuilder(target_type, tuple(a.name for a in attributes),
+                                 tuple(getattr(a, 'alias', None) or a.name.lstrip('_') for a in attributes))
+    elif target_type.__dictoffset__ == 0 and hasattr(target_type, '__slots__'):
+        fields = _slot_names(target_type)
+        builder = _TargetBuilder(target_type, fields, construct=_accepts_keywords(target_type, fields))
+
+    _builders[target_type] = builder
+    return builder
+
+
+def _slot_names(target_type: type) -> tuple:
+    names = {}
+    for klass in target_type.__mro__:
+        slots = vars(klass).get('__slots__', ())
+        for name in (slots,) if isinstance(slots, str) else slots:
+            if name != '__weakref__':
+                names[name] = None
+    return tuple(names)
+
+
+def _accepts_keywords(target_type: type, names: tuple) -> bool:
+    """
+    构造函数是否接收所有属性作为关键字参数
+    """
+    try:
+        parameters = inspect.signature(target_type).parameters.values()
+    except (TypeError, ValueError):
+        return False
+    if any(p.kind is inspect.Parameter.VAR_KEYWORD for p in parameters):
+        return True
+    keywords = {p.name for p in parameters if p.kind in (inspect.Parameter.POSITIONAL_OR_KEYWORD, inspect.Parameter.KEYWORD_ONLY)}
+    return keywords.issuperset(names)
+
+
+class _CopyPlan:
+    """
+    复制计划，缓存 source 属性到 target 属性的解析结果，并为 source 的属性布局生成专用的复制函数，
+    复制时不再重复 hasattr/mapping 查找；target 没有自定义 __setattr__ 和数据描述符时，直接写入 target.__dict__，
+    dataclass/NamedTuple/attrs/__slots__ 类型的 target 收集属性值后通过构造函数一次性创建，
+    in_place 时已有的可变 dataclass/attrs/__slots__ 实例和普通对象一样原地复制属性
+    """
+    __slots__ = ('source_type', 'target_type', 'mapping', 'skip_null', 'resolved', 'getters', 'setters', 'direct',
+                 'fields', 'builder', 'copier')
+
+    def __init__(self, source_type: type, target_type: type, mapping: dict | None, skip_null: bool, in_place: bool = False):
+        self.source_type = source_type
+        self.target_type = target_type
+        self.mapping = dict(mapping) if mapping else {}
+        self.skip_null = skip_null
+        # source key -> target key，None 表示 target 没有对应属性
+        self.resolved = {}
+        # 需要通过 getattr 读取的 source 属性
+        self.getters = frozenset() if issubclass(source_type, dict) else _data_descriptors(source_type)
+        # 需要通过 setattr 写入的 target 属性
+        self.setters = _data_descriptors(target_type)
+        # 没有 __dict__ 的 __slots__ 对象只能通过 setattr 写入
+        self.direct = target_type.__setattr__ is object.__setattr__ and target_type.__dictoffset__ != 0
+        builder = _target_builder(target_type)
+        # target 可以复制的属性，None 表示按 target 实例的属性检查
+        self.fields = builder.fields if builder is not None else None
+        self.builder = None if in_place else builder
+        # 第一次遇到的 source 属性布局生成的复制函数，布局不一致时返回 None 并回退到 apply
+        self.copier = None
+
+    def resolve(self, key: str, target: object) -> str | None:
+        target_key = self.mapping.get(key, key)
+        if self.fields is not None:
+            if target_key not in self.fields:
+                target_key = None
+        elif not hasattr(target, target_key):
+            target_key = None
+        if target_key is not None and target_key in self.setters:
+            self.direct = False
+        self.resolved[key] = target_key
+        return target_key
+
+    def copy(self, source, source_dict: dict, target: object, missing: Counter = None) -> object:
+        """
+        复制 source 属性到 target，target 没有对应属性时，计数到 missing 中，不传 missing 则直接记录到复制诊断
+        :return: target，通过构造函数创建的 target 类型返回新创建的对象
+        """
+        copier = self.copier
+        if copier is None:
+            for key in source_dict:
+                if key not in self.resolved:
+                    self.resolve(key, target)
+            copier = self.copier = self.compile(tuple(source_dict))
+        result = copier(source, source_dict, target)
+        if result is None:
+            return self.apply(source, source_dict, target, missing)
+        if copier.missing:
+            if missing is None:
+                self.warn(copier.missing)
+            else:
+                missing.update(copier.missing)
+        return result
+
+    def warn(self, keys: Counter | Iterable[str]):
+        """
+        target 没有对应属性的 source 属性记录到复制诊断中
+        """
+        if not isinstance(keys, Counter):
+            keys = Counter(keys)
+        mapping = self.mapping
+        bean_diagnostics.current().record_missing(
+            self.source_type, self.target_type, {mapping.get(key, key): count for key, count in keys.items()})
+
+    def error(self, key: str, error: Exception):
+        bean_diagnostics.current().record_error(self.source_type, self.target_type, key, error)
+
+    def compile(self, keys: tuple, row: bool = False):
+        """
+        生成 source 属性布局 keys 对应的复制函数，返回 target，source 的属性数量或名称不一致时返回 None
+        row 为 True 时，source_dict 为按 keys 顺序排列的行数据 tuple（如 values_list 的结果）
+        """
+        lines = ["def copier(source, source_dict, target):"]
+        if row:
+            if keys:
+                lines.append(f"    {''.join(f'v{i}, ' for i in range(len(keys)))}= source_dict")
+        else:
+            lines += [
+                f"    if len(source_dict) != {len(keys)}:",
+                "        return None",
+                "    try:",
+            ]
+            lines += [f"        v{i} = source_dict[{key!r}]" for i, key in enumerate(keys)]
+            lines += [
+                "    except KeyError:",
+                "        return None",
+            ]
+        if self.builder is not None:
+            lines.append("    values = {}")
+        elif self.direct:
+            lines.append("    target_dict = target.__dict__")
+        for i, key in enumerate(keys):
+            target_key = self.resolved[key]
+            if target_key is None:
+                continue
+            if key in self.getters:
+                lines += [
+                    "    try:",
+                    f"        v{i} = getattr(source, {key!r})",
+                    "    except AttributeError as e:",
+                    f"        error({key!r}, e)",
+                    "    else:",
+                ]
+                indent = "        "
+            else:
+                indent = "    "
+            if row:
+                # 行数据（values_list）中不会有关联的模型对象，Decimal、datetime 等值类型直接复制
+                condition = f"v{i} is not None" if self.skip_null else None
+            else:
+                condition = f"type(v{i}) in copyable or not is_skipped(type(v{i}))"
+                if self.skip_null:
+                    condition = f"v{i} is not None and ({condition})"
+            if condition is not None:
+                lines.append(f"{indent}if {condition}:")
+                indent += "    "
+            if self.builder is not None:
+                lines.append(f"{indent}values[{target_key!r}] = v{i}")
+            elif self.direct:
+                lines.append(f"{indent}target_dict[{target_key!r}] = v{i}")
+            else:
+                lines += [
+                    f"{indent}try:",
+                    f"{indent}    setattr(target, {target_key!r}, v{i})",
+                    f"{indent}except AttributeError as e:",
+                    f"{indent}    error({key!r}, e)",
+                ]
+        if self.builder is not None:
+            lines.append("    return build(values, target)")
+        else:
+            lines.append("    return target")
+
+        namespace = {'copyable': _copyable_types, 'is_skipped': _is_skipped_type, 'error': self.error,
+                     'build': self.builder.build if self.builder is not None else None}
+        exec("\n".join(lines), namespace)
+        copier = namespace['copier']
+        copier.missing = tuple(key for key in keys if self.resolved[key] is None)
+        return copier
+
+    def apply(self, source, source_dict: dict, target: object, missing: Counter = None) -> object:
+        return self.write(target, self.collect(source, source_dict, target, missing))
+
+    def collect(self, source, source_dict: dict, target: object, missing: Counter = None) -> dict:
+        """
+        收集需要复制的属性值 target key -> value
+        """
+        resolved = self.resolved
+        getters = self.getters
+        skip_null = self.skip_null
+        values = {}
+
+        for key, value in source_dict.items():
+            try:
+                target_key = resolved[key]
+            except KeyError:
+                target_key = self.resolve(key, target)
+
+            if target_key is None:
+                if missing is None:
+                    self.warn((key,))
+                else:
+                    missing[key] += 1
+                continue
+            if key in getters:
+                try:
+                    value = getattr(source, key)
+                except AttributeError as e:
+                    self.error(key, e)
+                    continue
+            if value is None:
+                if skip_null:
+                    continue
+            elif type(value) not in _copyable_types and _is_skipped_type(type(value)):
+                continue
+            values[target_key] = value
+
+        return values
+
+    def write(self, target: object, values: dict) -> object:
+        if self.builder is not None:
+            return self.builder.build(values, target)
+        if self.direct:
+            target.__dict__.update(values)
+            return target
+        for target_key, value in values.items():
+            try:
+                setattr(target, target_key, value)
+            except AttributeError as e:
+                # 处理 setattr 抛出的异常
+                self.error(target_key, e)
+        return target
+
+
 if __name__ == '__main__':
     class Item:
         def __init__(self, name, value):
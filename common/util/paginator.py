@@ -0,0 +1,166 @@
+import base64
+import json
+from collections.abc import Sequence
+
+from django.core.exceptions import ValidationError
+from django.core.paginator import Paginator, InvalidPage
+from django.db import connections
+from django.db.models import QuerySet, Q
+from django.utils.functional import cached_property
+
+
+def estimate_count(model, using: str = 'default') -> int | None:
+    """
+    使用数据库统计信息估算表的行数，不执行 COUNT(*) 全表扫描
+        - postgresql：pg_class.reltuples
+        - mysql：information_schema.tables.table_rows
+        - sqlite：MAX(rowid)，通过 B-tree 直接定位，删除过的数据会使估算值偏大
+    :param model: 模型类
+    :param using: 数据库别名
+    :return: 估算的行数，不支持的数据库或者没有统计信息时返回 None
+    """
+    connection = connections[using]
+    table = model._meta.db_table
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            cursor.execute("SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass", [table])
+        elif connection.vendor == 'mysql':
+            cursor.execute("SELECT table_rows FROM information_schema.tables "
+                           "WHERE table_schema = DATABASE() AND table_name = %s", [table])
+        elif connection.vendor == 'sqlite':
+            cursor.execute(f"SELECT MAX(rowid) FROM {connection.ops.quote_name(table)}")
+        else:
+            return None
+        row = cursor.fetchone()
+    return row[0] if row and row[0] and row[0] > 0 else None
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    大表分页：没有过滤条件时使用 estimate_count 估算总数，避免每次分页都执行 COUNT(*) 全表扫描
+        - 估算值小于 threshold 或者有过滤条件时，使用准确的 count()
+        - ModelAdmin.paginator = EstimatedCountPaginator
+    """
+    threshold = 10000
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        if isinstance(queryset, QuerySet) and not queryset.query.where and not queryset.query.distinct \
+                and not queryset.query.is_sliced:
+            estimate = estimate_count(queryset.model, queryset.db)
+            if estimate is not None and estimate >= self.threshold:
+                return estimate
+        return super().count
+
+
+class CursorPage(Sequence):
+    """
+    游标分页的一页，next_cursor/previous_cursor 为下一页、上一页的游标，没有时为 None
+    """
+
+    def __init__(self, object_list: list, next_cursor: str | None, previous_cursor: str | None):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def __repr__(self):
+        return f"<CursorPage of {len(self)} objects>"
+
+    def has_next(self) -> bool:
+        return self.next_cursor is not None
+
+    def has_previous(self) -> bool:
+        return self.previous_cursor is not None
+
+    def has_other_pages(self) -> bool:
+        return self.has_next() or self.has_previous()
+
+
+class CursorPaginator:
+    """
+    游标（keyset）分页：按排序字段的值定位下一页，WHERE (published_date, id) < (?, ?) ORDER BY ... LIMIT n
+        - 不使用 OFFSET，任意深度的分页都是排序索引上的一次范围查询，查询开销不随页数增长
+        - 游标是最后一行（上一页为第一行）排序字段值的 base64 编码，对客户端不透明
+        - ordering 的最后一个字段必须唯一（通常是 id），排序字段需要有对应的索引
+        paginator = CursorPaginator(Post.objects.all(), 5, ordering=('-published_date', '-id'))
+        page = paginator.page(request.GET.get('cursor'))
+    """
+
+    def __init__(self, queryset: QuerySet, per_page: int, ordering: tuple = ('-published_date', '-id')):
+        self.queryset = queryset
+        self.per_page = int(per_page)
+        self.ordering = tuple(ordering)
+        self.fields = [queryset.model._meta.get_field(name.lstrip('-')) for name in self.ordering]
+        if not self.fields[-1].unique:
+            raise ValueError(f"the last ordering field {self.fields[-1].name} must be unique")
+
+    def page(self, cursor: str | None = None) -> CursorPage:
+        """
+        :param cursor: 游标，None 为第一页
+        :raise InvalidPage: 游标无效
+        """
+        if cursor is None:
+            rows = list(self.queryset.order_by(*self.ordering)[:self.per_page + 1])
+            return self._page(rows, has_next=len(rows) > self.per_page, has_previous=False)
+
+        backward, values = self.decode_cursor(cursor)
+        ordering = self.ordering
+        if backward:
+            ordering = tuple(name[1:] if name.startswith('-') else f"-{name}" for name in ordering)
+        rows = list(self.queryset.filter(self._after(ordering, values)).order_by(*ordering)[:self.per_page + 1])
+        more = len(rows) > self.per_page
+        if backward:
+            rows = rows[:self.per_page][::-1]
+            return self._page(rows, has_next=True, has_previous=more, limit=False)
+        return self._page(rows, has_next=more, has_previous=True)
+
+    def _page(self, rows: list, has_next: bool, has_previous: bool, limit: bool = True) -> CursorPage:
+        if limit:
+            rows = rows[:self.per_page]
+        next_cursor = self.encode_cursor(rows[-1]) if has_next and rows else None
+        previous_cursor = self.encode_cursor(rows[0], backward=True) if has_previous and rows else None
+        return CursorPage(rows, next_cursor, previous_cursor)
+
+    def _after(self, ordering: tuple, values: list) -> Q:
+        """
+        排在游标之后的行：(a, b) > (x, y) 展开为 a >= x AND (a > x OR (a = x AND b > y))
+        第一个条件让数据库可以直接在第一个排序字段的索引上做范围查找
+        """
+        condition = Q()
+        for i in range(len(ordering) - 1, -1, -1):
+            name = ordering[i].lstrip('-')
+            compare = 'lt' if ordering[i].startswith('-') else 'gt'
+            condition = Q(**{f"{name}__{compare}": values[i]}) | (Q(**{name: values[i]}) & condition) \
+                if condition else Q(**{f"{name}__{compare}": values[i]})
+        first = ordering[0].lstrip('-')
+        return Q(**{f"{first}__{'lte' if ordering[0].startswith('-') else 'gte'}": values[0]}) & condition
+
+    def encode_cursor(self, obj, backward: bool = False) -> str:
+        values = [field.value_from_object(obj) for field in self.fields]
+        data = json.dumps([int(backward), values], default=_cursor_value, separators=(',', ':'))
+        return base64.urlsafe_b64encode(data.encode()).decode().rstrip('=')
+
+    def decode_cursor(self, cursor: str) -> tuple[bool, list]:
+        try:
+            backward, values = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+            if len(values) != len(self.fields):
+                raise ValueError(cursor)
+            values = [field.to_python(value) for field, value in zip(self.fields, values)]
+            # 非空字段的值为 None 时无法比较大小
+            if any(value is None and not field.null for field, value in zip(self.fields, values)):
+                raise ValueError(cursor)
+            return bool(backward), values
+        except (ValueError, TypeError, ValidationError):
+            raise InvalidPage("Invalid cursor")
+
+
+def _cursor_value(value):
+    # DjangoJSONEncoder 会把时间截断到毫秒，游标需要精确的值
+    return value.isoformat() if hasattr(value, 'isoformat') else str(value)
@@ -0,0 +1,177 @@
+"""
+递归查询（WITH RECURSIVE）：一次查询得到自引用外键、自关联多对多的所有子孙、祖先以及可达节点
+    - descendants(node)：Tree.parent 的所有子孙节点
+    - ancestors(node)：Tree.parent 的所有祖先节点，从根节点开始
+    - reachable(employee, 'teams')：Employee.teams 传递可达的所有员工
+    返回对象列表，每个对象的 distance 属性为到起点的最短距离（层级），按 distance 排序
+
+    防止环：
+        - 不限制 max_depth：递归部分只有节点 id，UNION 去掉已经访问过的节点，每个节点只访问一次，
+          有环（A -> B -> A）的数据和对称的多对多关系（每条边都是环）递归次数都不会超过起点到最远节点的距离，
+          查询同时返回可达节点的出边，在内存中按广度优先计算最短距离
+        - 指定 max_depth：递归部分带 depth 列，depth 达到 max_depth 时停止递归，只访问 max_depth 以内的节点，
+          最短距离在数据库中按 MIN(depth) GROUP BY id 计算
+    支持 sqlite、postgresql、mysql 8
+"""
+from django.db import connections
+from django.db.models import Model
+from django.db.models.sql import Query
+
+
+def descendants(node: Model, parent_field: str = 'parent', max_depth: int = None) -> list:
+    """
+    自引用外键的所有子孙节点
+    :param node: 起点
+    :param parent_field: 指向父节点的外键字段
+    :param max_depth: 最大层级，1 为子节点
+    """
+    model = type(node)
+    return recursive_query(model, node.pk, model._meta.db_table, model._meta.get_field(parent_field).column,
+                           model._meta.pk.column, max_depth)
+
+
+def ancestors(node: Model, parent_field: str = 'parent', max_depth: int = None) -> list:
+    """
+    自引用外键的所有祖先节点，从根节点开始
+    :param node: 起点
+    :param parent_field: 指向父节点的外键字段
+    :param max_depth: 最大层级，1 为父节点
+    """
+    model = type(node)
+    return recursive_query(model, node.pk, model._meta.db_table, model._meta.pk.column,
+                           model._meta.get_field(parent_field).column, max_depth, ordering='DESC')
+
+
+def reachable(obj: Model, field: str, max_depth: int = None) -> list:
+    """
+    自关联多对多传递可达的所有对象（不包括自己），例如 reachable(employee, 'teams') 为同事、同事的同事 ...
+    :param obj: 起点
+    :param field: 自关联的 ManyToManyField
+    :param max_depth: 最大距离，1 为直接关联的对象
+    """
+    m2m = type(obj)._meta.get_field(field)
+    return recursive_query(type(obj), obj.pk, m2m.remote_field.through._meta.db_table, m2m.m2m_column_name(),
+                           m2m.m2m_reverse_name(), max_depth)
+
+
+def recursive_query(model: type[Model], start, edge_table: str, source: str, target: str, max_depth: int = None,
+                    ordering: str = 'ASC', using: str = 'default') -> list:
+    """
+    沿着边 edge_table.source -> edge_table.target 递归查询从 start 可达的 model 对象
+    :param model: 节点模型
+    :param start: 起点主键
+    :param edge_table: 边所在的表（自引用外键为模型自己的表，多对多为中间表）
+    :param source: 边的起点列
+    :param target: 边的终点列
+    :param max_depth: 最大距离，None 不限制
+    :param ordering: 按 distance 排序的方向，ASC 或 DESC
+    :param using: 数据库别名
+    :return: 可达的对象（不包括起点），distance 属性为到起点的最短距离
+    """
+    if ordering not in ('ASC', 'DESC'):
+        raise ValueError(f"invalid ordering: {ordering}")
+    connection = connections[using]
+    qn = connection.ops.quote_name
+    table, pk, edges = qn(model._meta.db_table), qn(model._meta.pk.column), qn(edge_table)
+    columns = ", ".join(f"m.{qn(field.column)}" for field in model._meta.concrete_fields)
+    size = len(model._meta.concrete_fields)
+    if max_depth is None:
+        sql = (
+            graph_sql(model, edge_table, source, target, using=using) +
+            # 每个可达节点和它的出边一行，没有出边的节点 next_id 为 NULL
+            f"SELECT {columns}, e.{qn(target)} AS next_id FROM graph g INNER JOIN {table} m ON m.{pk} = g.id "
+            f"LEFT OUTER JOIN {edges} e ON e.{qn(source)} = g.id AND e.{qn(target)} IS NOT NULL"
+        )
+        params = [start]
+    else:
+        sql = (
+            graph_sql(model, edge_table, source, target, max_depth, using) +
+            f"SELECT {columns}, d.distance FROM (SELECT id, MIN(depth) AS distance FROM graph GROUP BY id) d "
+            f"INNER JOIN {table} m ON m.{pk} = d.id WHERE d.distance > 0 ORDER BY d.distance {ordering}, m.{pk}"
+        )
+        params = [start, max_depth]
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        rows = cursor.fetchall()
+
+    if max_depth is None:
+        rows = _shortest_distances(rows, start, model._meta.concrete_fields.index(model._meta.pk), size, ordering)
+
+    # 字段值按 RawQuerySet 相同的方式转换
+    fields = model._meta.concrete_fields
+    compiler = connection.ops.compiler('SQLCompiler')(Query(model), connection, using)
+    converters = compiler.get_converters([field.get_col(model._meta.db_table) for field in fields])
+    attnames = [field.attname for field in fields]
+    values = [row[:size] for row in rows]
+    if converters:
+        values = compiler.apply_converters(values, converters)
+    result = []
+    for row, value in zip(rows, values):
+        obj = model.from_db(using, attnames, value)
+        obj.distance = row[size]
+        result.append(obj)
+    return result
+
+
+def _shortest_distances(rows: list, start, index: int, size: int, ordering: str) -> list:
+    """
+    可达节点及其出边的行（同一个节点有多行）按广度优先计算最短距离
+    :return: 每个节点一行 (*字段值, distance)，不包括起点，按 distance、主键排序
+    """
+    rows_by_pk, neighbors = {}, {}
+    for row in rows:
+        node_id = row[index]
+        if node_id not in neighbors:
+            rows_by_pk[node_id] = row[:size]
+            neighbors[node_id] = []
+        if row[size] is not None:
+            neighbors[node_id].append(row[size])
+    if start not in neighbors:
+        return []
+
+    distances = {start: 0}
+    frontier = [start]
+    while frontier:
+        distance = distances[frontier[0]] + 1
+        next_frontier = []
+        for pk in frontier:
+            for next_id in neighbors[pk]:
+                if next_id not in distances:
+                    distances[next_id] = distance
+                    next_frontier.append(next_id)
+        frontier = next_frontier
+
+    ids = sorted((pk for pk in distances if pk != start),
+                 key=lambda pk: (-distances[pk] if ordering == 'DESC' else distances[pk], pk))
+    return [(*rows_by_pk[pk], distances[pk]) for pk in ids]
+
+
+def graph_sql(model: type[Model], edge_table: str, source: str, target: str, max_depth: int = None,
+              using: str = 'default') -> str:
+    """
+    WITH RECURSIVE graph 从起点（参数 %s）可达的节点
+        - max_depth 为 None 时只有 id 列，每个节点只有一行
+        - 否则为 (id, depth) 列，depth 不超过 max_depth（参数 %s），同一个节点可能有多个 depth
+    """
+    qn = connections[using].ops.quote_name
+    table, pk, edges = qn(model._meta.db_table), qn(model._meta.pk.column), qn(edge_table)
+    if max_depth is None:
+        return (
+            f"WITH RECURSIVE graph (id) AS ("
+            # 起点从表中查询，id 列的类型与主键一致
+            f"SELECT {pk} FROM {table} WHERE {pk} = %s "
+            # 递归部分只有 id，UNION 去掉已经访问过的节点，有环时也不会重复访问
+            f"UNION "
+            f"SELECT e.{qn(target)} FROM {edges} e INNER JOIN graph g ON e.{qn(source)} = g.id "
+            f"WHERE e.{qn(target)} IS NOT NULL"
+            f") "
+        )
+    return (
+        f"WITH RECURSIVE graph (id, depth) AS ("
+        f"SELECT {pk}, 0 FROM {table} WHERE {pk} = %s "
+        # depth 达到 max_depth 的节点不再递归
+        f"UNION "
+        f"SELECT e.{qn(target)}, g.depth + 1 FROM {edges} e INNER JOIN graph g ON e.{qn(source)} = g.id "
+        f"WHERE e.{qn(target)} IS NOT NULL AND g.depth < %s"
+        f") "
+    )
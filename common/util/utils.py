@@ -1,13 +1,30 @@
+import datetime
+import decimal
+import enum
+import uuid
+
 from django.db.models.base import ModelState
 
+# 有界模式下直接转换为字符串的类型，其他类型只输出类型名称
+_SCALAR_TYPES = (str, int, float, decimal.Decimal, datetime.date, datetime.time, datetime.timedelta,
+                 uuid.UUID, enum.Enum, type(None))
+
 
-def object_to_string(obj, max_length=15):
+def object_to_string(obj, max_length=15, bounded=False, budget=200):
     """
     将对象转换为字符串
     :param obj: 要转换的对象
     :param max_length: 属性值的最大长度，默认为15
+    :param bounded: 有界模式，用于日志等需要控制开销的场景
+        - 不输出 _ 开头的属性（_state、_prefetched_objects_cache 等缓存），不会遍历关联对象，也不会触发查询
+        - 模型、列表、字典等非标量的值只输出类型名称，例如 <Book>、<list>
+        - 所有类型的值都按 max_length 截断，整个字符串超过 budget 时以 ... 结尾
+    :param budget: 有界模式下字符串的最大长度，默认为200
     :return: 字符串表示
     """
+    if bounded:
+        return _bounded_string(obj, max_length, budget)
+
     attributes = vars(obj)  # 获取对象的所有属性
     result = []
 
@@ -30,4 +47,108 @@ def object_to_string(obj, max_length=15):
         result.append(f"{key}: {masked_value}")
 
     # 使用逗号和空格连接所有属性
-    return ', '.join(result)
\ No newline at end of file
+    return ', '.join(result)
+
+
+def _bounded_string(obj, max_length, budget):
+    attributes = getattr(obj, '__dict__', None)
+    if attributes is None:
+        return f"<{type(obj).__name__}>"
+    result = []
+    length = 0
+
+    for key, value in attributes.items():
+        if key[0] == '_':
+            continue
+        text = (value if isinstance(value, str) else str(value)) if isinstance(value, _SCALAR_TYPES) \
+            else f"<{type(value).__name__}>"
+        if len(text) > 10:
+            text = text[:10] + '*' * (min(len(text), max_length) - 10)
+
+        length += len(key) + len(text) + 4
+        if length > budget:
+            result.append('...')
+            break
+        result.append(f"{key}: {text}")
+
+    return ', '.join(result)
+
+
+# (model class, max_length) -> 格式化函数
+_formatters = {}
+
+
+def model_to_string(obj, max_length=15):
+    """
+    将模型对象转换为字符串，脱敏规则与 object_to_string 相同
+        - 每个模型类只根据 _meta.concrete_fields 生成一次格式化函数，之后直接按字段读取 __dict__
+        - 只输出字段值，不输出 _state、_prefetched_objects_cache 等缓存，延迟加载（defer）的字段不输出，也不会触发查询
+        __str__ = utils.model_to_string
+    :param obj: 模型对象
+    :param max_length: 属性值的最大长度，默认为15
+    :return: 字符串表示
+    """
+    formatter = _formatters.get((obj.__class__, max_length))
+    if formatter is None:
+        formatter = _formatters[(obj.__class__, max_length)] = _model_formatter(obj.__class__, max_length)
+    return formatter(obj)
+
+
+def _mask(value, max_length):
+    if isinstance(value, str):
+        return value[:10] + '*' * (min(len(value), max_length) - 10)
+    return f"{value}"
+
+
+def _model_formatter(model, max_length):
+    """
+    生成模型的格式化函数：所有字段都已加载时使用生成的 f-string，有延迟加载的字段时逐个字段判断
+    """
+    attnames = tuple(field.attname for field in model._meta.concrete_fields)
+
+    def format_loaded(obj):
+        values = obj.__dict__
+        return ', '.join(f"{name}: {_mask(values[name], max_length)}" for name in attnames if name in values)
+
+    lines = ["def format(obj):",
+             "    values = obj.__dict__",
+             "    try:",
+             *(f"        v{i} = values[{name!r}]" for i, name in enumerate(attnames)),
+             "    except KeyError:",
+             "        return format_loaded(obj)"]
+    for i in range(len(attnames)):
+        lines.append(f"    if isinstance(v{i}, str): v{i} = v{i}[:10] + '*' * (min(len(v{i}), {max_length!r}) - 10)")
+    parts = ', '.join(f"{name}: {{v{i}}}" for i, name in enumerate(attnames))
+    lines.append(f"    return f{parts!r}")
+    source = '\n'.join(lines) + '\n'
+    namespace = {'format_loaded': format_loaded}
+    exec(compile(source, f"<model_to_string {model.__qualname__}>", 'exec'), namespace)
+    return namespace['format']
+
+
+class LazyString:
+    """
+    延迟转换的字符串，只有在使用（例如日志真正输出）时才格式化对象，普通对象使用 object_to_string 的有界模式
+        logger.debug("post: %s", utils.lazy_string(post))
+    """
+    __slots__ = ('obj', 'max_length')
+
+    def __init__(self, obj, max_length=15):
+        self.obj = obj
+        self.max_length = max_length
+
+    def __str__(self):
+        if hasattr(self.obj, '_meta'):
+            return model_to_string(self.obj, self.max_length)
+        return object_to_string(self.obj, self.max_length, bounded=True)
+
+    __repr__ = __str__
+
+
+def lazy_string(obj, max_length=15):
+    """
+    创建延迟转换的字符串
+    :param obj: 模型或者普通对象
+    :param max_length: 属性值的最大长度，默认为15
+    """
+    return LazyString(obj, max_length)
@@ -96,6 +96,16 @@ DATABASES = {
     }
 }
 
+# 缓存，本地内存缓存不需要外部服务，多进程部署时可以改为 FileBasedCache 或者 Redis
+# https://docs.djangoproject.com/zh-hans/5.1/topics/cache/
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'django-examples',
+        'TIMEOUT': 300,
+    }
+}
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
@@ -141,6 +151,15 @@ STATIC_URL = 'static/'
 # https://docs.djangoproject.com/en/5.1/ref/settings/#default-auto-field
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
+# 投票写缓冲，启用后投票先在进程内累加，定时批量写入数据库，参考 apps/polls/vote_buffer.py
+POLLS_VOTE_BUFFER = {
+    'ENABLED': False,
+    # 写入间隔（秒）
+    'FLUSH_INTERVAL': 0.5,
+    # 累计多少票立即写入
+    'FLUSH_SIZE': 100,
+}
+
 # 调试工具 可显示的IP地址
 INTERNAL_IPS = [
     '127.0.0.1'